@@ -0,0 +1,5 @@
+"""Benchmarks of Vindex.
+
+These are not tests and are not collected by test runners. Run them from the repository root,
+for example with ``python -m benchmarks.dispatch --help``.
+"""
@@ -0,0 +1,116 @@
+"""Microbenchmark of the blacklist check.
+
+Every command goes through :py:meth:`BlacklistService.is_blacklisted` in the global checks. This
+measures it, and adding and removing an ID, against the list the service used to keep, for a
+blacklist of the given size.
+
+Results are printed as JSON, so they can be compared between versions::
+
+    python -m benchmarks.blacklist --entries 100000 --output results.json
+"""
+
+import argparse
+import collections.abc
+import json
+import platform
+import random
+import sys
+import timeit
+import typing
+
+from vindex import __version__
+from vindex.core.services.blacklist import BlacklistService
+
+from .fakes import snowflake
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+def best_of(statement: collections.abc.Callable[[], object], *, number: int, repeat: int) -> float:
+    """Return the best time of a call to ``statement`` over ``repeat`` runs, in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def measure(
+    contains: collections.abc.Callable[[int], bool],
+    add: collections.abc.Callable[[int], None],
+    remove: collections.abc.Callable[[int], None],
+    ids: list[int],
+    *,
+    number: int,
+    repeat: int,
+) -> dict[str, float]:
+    """Measure a lookup of a listed and unlisted ID, and adding then removing an ID."""
+    rng = random.Random(0)
+    listed = rng.choice(ids)
+    unlisted = snowflake()
+
+    def add_remove() -> None:
+        add(unlisted)
+        remove(unlisted)
+
+    return {
+        "hit_us": best_of(lambda: contains(listed), number=number, repeat=repeat),
+        "miss_us": best_of(lambda: contains(unlisted), number=number, repeat=repeat),
+        "add_remove_us": best_of(add_remove, number=number, repeat=repeat),
+    }
+
+
+def run(arguments: argparse.Namespace) -> dict[str, typing.Any]:
+    """Fill both blacklists and measure them."""
+    ids = [snowflake() for _ in range(arguments.entries)]
+
+    service = BlacklistService(typing.cast("Vindex", None))
+    service.blacklisted_ids = set(ids)
+    # What the service kept before the blacklist was a set.
+    listed = list(ids)
+
+    return {
+        "vindex": __version__,
+        "python": platform.python_version(),
+        "entries": arguments.entries,
+        "set": measure(
+            service.is_blacklisted,
+            service.blacklisted_ids.add,
+            service.blacklisted_ids.discard,
+            ids,
+            number=arguments.number,
+            repeat=arguments.repeat,
+        ),
+        "list": measure(
+            listed.__contains__,
+            listed.append,
+            listed.remove,
+            ids,
+            number=max(arguments.number // 1000, 1),
+            repeat=arguments.repeat,
+        ),
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.blacklist", description="Benchmark Vindex's blacklist check."
+    )
+    parser.add_argument("--entries", type=int, default=100_000, help="Blacklisted IDs.")
+    parser.add_argument(
+        "--number", type=int, default=100_000, help="Calls per run, divided by 1000 for the list."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs, the best one is kept.")
+    parser.add_argument("--output", help="File to write the results to. Defaults to stdout.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    output = json.dumps(run(arguments), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
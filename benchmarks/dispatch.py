@@ -0,0 +1,198 @@
+"""End-to-end benchmark of command dispatch.
+
+Synthetic MESSAGE_CREATE events are injected into a real :py:class:`~vindex.core.bot.Vindex`
+through a fake gateway. Each event goes through ``on_message``, ``get_context``, the global
+checks, the command and ``ctx.send``, which is answered by a fake HTTP client.
+
+Results are printed as JSON, so they can be compared between versions::
+
+    python -m benchmarks.dispatch --messages 10000 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import typing
+
+import discord
+import uvloop
+
+from vindex import __version__
+
+from .fakes import (
+    BOT_ID,
+    OWNER_ID,
+    FakeGateway,
+    Sample,
+    build_bot,
+    message_payload,
+    user_payload,
+)
+
+SCENARIOS: dict[str, str] = {
+    "noise": "just chatting, nothing to see here",
+    "unknown": f"<@{BOT_ID}> notacommand",
+    "invite": f"<@{BOT_ID}> invite",
+    "about": f"<@{BOT_ID}> about",
+    "locale": f"<@{BOT_ID}> set locale",
+}
+"""The content of the messages sent in each scenario."""
+
+OWNER_SCENARIOS = {"locale"}
+"""Scenarios whose messages are sent by the bot's owner, as their command requires it."""
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Return the p50, p90 and p99 and max of the given durations, in milliseconds."""
+    if len(values) < 2:
+        value = values[0] * 1000 if values else 0.0
+        return {"p50": value, "p90": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p90": cuts[89] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(values) * 1000,
+    }
+
+
+async def run_scenario(
+    gateway: FakeGateway,
+    targets: list[tuple[discord.Guild, discord.TextChannel]],
+    content: str,
+    *,
+    messages: int,
+    concurrency: int,
+    as_owner: bool,
+) -> dict[str, typing.Any]:
+    """Inject messages with the given content, at most ``concurrency`` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[tuple[Sample, float]] = []
+    owner = user_payload(OWNER_ID, "owner")
+    rng = random.Random(0)
+
+    async def inject() -> None:
+        guild, channel = rng.choice(targets)
+        if as_owner:
+            author = owner
+        else:
+            member = rng.choice(guild.members)
+            while member.bot:
+                member = rng.choice(guild.members)
+            author = user_payload(member.id, member.name)
+        payload = message_payload(channel.id, author, content, guild_id=guild.id)
+        async with semaphore:
+            sample = gateway.message_create(payload)
+            samples.append((sample, await sample.done))
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for _ in range(messages):
+            group.create_task(inject())
+    duration = time.perf_counter() - start
+
+    total = [end - sample.start for sample, end in samples]
+    replies = [
+        sample.first_request - sample.start for sample, _ in samples if sample.first_request
+    ]
+    return {
+        "messages": messages,
+        "concurrency": concurrency,
+        "duration": duration,
+        "throughput": messages / duration,
+        "latency_ms": percentiles(total),
+        "reply_latency_ms": percentiles(replies) if replies else None,
+        "replies": len(replies),
+    }
+
+
+async def run(arguments: argparse.Namespace) -> dict[str, typing.Any]:
+    """Build the bot, run every requested scenario and return the results."""
+    bot, gateway, http = await build_bot(
+        guilds=arguments.guilds,
+        channels_per_guild=arguments.channels,
+        members_per_guild=arguments.members,
+    )
+    targets = [(guild, channel) for guild in bot.guilds for channel in guild.text_channels]
+
+    results: dict[str, typing.Any] = {}
+    for name in arguments.scenario or SCENARIOS:
+        # Warm up caches and lazy imports, so they are not measured.
+        await run_scenario(
+            gateway,
+            targets,
+            SCENARIOS[name],
+            messages=min(arguments.messages, 100),
+            concurrency=arguments.concurrency,
+            as_owner=name in OWNER_SCENARIOS,
+        )
+        http.requests.clear()
+        results[name] = await run_scenario(
+            gateway,
+            targets,
+            SCENARIOS[name],
+            messages=arguments.messages,
+            concurrency=arguments.concurrency,
+            as_owner=name in OWNER_SCENARIOS,
+        )
+        results[name]["http_requests"] = dict(http.requests)
+
+    return {
+        "vindex": __version__,
+        "discord.py": discord.__version__,
+        "python": platform.python_version(),
+        "event_loop": "asyncio" if arguments.no_uvloop else "uvloop",
+        "debug": __debug__,
+        "guilds": arguments.guilds,
+        "members_per_guild": arguments.members,
+        "scenarios": results,
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.dispatch", description="Benchmark Vindex's command dispatch."
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to run. Can be repeated. Defaults to every scenario.",
+    )
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per scenario.")
+    parser.add_argument(
+        "--concurrency", type=int, default=50, help="Maximum number of messages handled at once."
+    )
+    parser.add_argument("--guilds", type=int, default=100, help="Number of guilds.")
+    parser.add_argument("--channels", type=int, default=5, help="Text channels per guild.")
+    parser.add_argument("--members", type=int, default=50, help="Members per guild.")
+    parser.add_argument(
+        "--no-uvloop", action="store_true", help="Use asyncio's default event loop."
+    )
+    parser.add_argument("--output", help="File to write the results to. Defaults to stdout.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    logging.basicConfig(level=logging.ERROR)
+
+    loop_factory = None if arguments.no_uvloop else uvloop.new_event_loop
+    results = asyncio.run(run(arguments), loop_factory=loop_factory)
+
+    output = json.dumps(results, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Stand-ins for Discord's gateway and HTTP API, and for the database.
+
+Nothing here touches the network: events are injected into the bot's connection state, and HTTP
+requests are answered in memory.
+"""
+
+import asyncio
+import collections
+import collections.abc
+import contextvars
+import dataclasses
+import itertools
+import time
+import typing
+
+import discord
+from discord.http import HTTPClient, Route
+
+from prisma.models import Core
+from vindex.core.bot import Vindex
+from vindex.settings import Settings
+
+BOT_ID = 100_000_000_000_000_001
+OWNER_ID = 100_000_000_000_000_002
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+
+_snowflakes = itertools.count(200_000_000_000_000_000)
+
+
+def snowflake() -> int:
+    """Return a new unique ID."""
+    return next(_snowflakes)
+
+
+def user_payload(user_id: int, name: str, *, bot: bool = False) -> dict[str, typing.Any]:
+    """Return the payload of a user."""
+    return {
+        "id": str(user_id),
+        "username": name,
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+def member_payload(user: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """Return the payload of a member."""
+    return {
+        "user": user,
+        "roles": [],
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def guild_payload(
+    guild_id: int,
+    channel_ids: collections.abc.Sequence[int],
+    members: collections.abc.Sequence[dict[str, typing.Any]],
+) -> dict[str, typing.Any]:
+    """Return the payload of a guild, as sent in GUILD_CREATE. The guild is fully chunked."""
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "icon": None,
+        "owner_id": str(OWNER_ID),
+        "roles": [
+            {
+                "id": str(guild_id),
+                "name": "@everyone",
+                "permissions": str(discord.Permissions.general().value),
+                "position": 0,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+        ],
+        "channels": [
+            {
+                "id": str(channel_id),
+                "type": discord.ChannelType.text.value,
+                "name": f"channel-{channel_id}",
+                "position": position,
+                "permission_overwrites": [],
+            }
+            for position, channel_id in enumerate(channel_ids)
+        ],
+        "members": list(members),
+        "member_count": len(members),
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "large": False,
+    }
+
+
+def message_payload(
+    channel_id: int,
+    author: dict[str, typing.Any],
+    content: str,
+    *,
+    guild_id: int | None = None,
+    embeds: list[dict[str, typing.Any]] | None = None,
+) -> dict[str, typing.Any]:
+    """Return the payload of a message, as sent in MESSAGE_CREATE."""
+    payload: dict[str, typing.Any] = {
+        "id": str(snowflake()),
+        "channel_id": str(channel_id),
+        "author": author,
+        "content": content,
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": embeds or [],
+        "pinned": False,
+        "type": 0,
+    }
+    if guild_id is not None:
+        payload["guild_id"] = str(guild_id)
+        payload["member"] = {k: v for k, v in member_payload(author).items() if k != "user"}
+    return payload
+
+
+@dataclasses.dataclass
+class Sample:
+    """The timings of a single injected event."""
+
+    start: float
+    """When the event was received, from :py:func:`time.perf_counter`."""
+
+    done: asyncio.Future[float]
+    """Resolved with the time every handler of the event finished."""
+
+    first_request: float | None = None
+    """When the first HTTP request was made while handling the event, if any."""
+
+    pending: int = 0
+    """Number of handlers of the event still running."""
+
+
+current_sample: contextvars.ContextVar[Sample | None] = contextvars.ContextVar(
+    "current_sample", default=None
+)
+"""The event being handled. Inherited by the tasks of its handlers."""
+
+
+class FakeHTTPClient(HTTPClient):
+    """HTTP client answering every request in memory.
+
+    Sent messages are echoed back, other requests return an empty object.
+    """
+
+    requests: collections.Counter[str]
+    """Number of requests made, by route."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, bot_user: dict[str, typing.Any]) -> None:
+        super().__init__(loop)
+        self.bot_user = bot_user
+        self.requests = collections.Counter()
+
+    async def request(self, route: Route, **kwargs: typing.Any) -> typing.Any:
+        self.requests[route.key] += 1
+        sample = current_sample.get()
+        if sample and sample.first_request is None:
+            sample.first_request = time.perf_counter()
+
+        if route.key == "POST /channels/{channel_id}/messages":
+            payload = kwargs.get("json") or {}
+            return message_payload(
+                route.channel_id or 0,
+                self.bot_user,
+                payload.get("content") or "",
+                embeds=payload.get("embeds"),
+            )
+        return {}
+
+
+class FakeDatabase:
+    """In-memory stand-in for the Prisma client.
+
+    Services are given their state directly instead of reading it from the database, so the
+    database is never queried while handling events. Any query fails loudly.
+    """
+
+    def __init__(self) -> None:
+        self.query_hooks: list[typing.Any] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    def __getattr__(self, name: str) -> typing.NoReturn:
+        raise RuntimeError(f"The benchmark database does not support {name!r}.")
+
+
+class BenchVindex(Vindex):
+    """Vindex, keeping track of the handlers of each injected event."""
+
+    def _schedule_event(
+        self,
+        coro: collections.abc.Callable[
+            ..., collections.abc.Coroutine[typing.Any, typing.Any, typing.Any]
+        ],
+        event_name: str,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> asyncio.Task[None]:
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        sample = current_sample.get()
+        if sample:
+            sample.pending += 1
+            task.add_done_callback(lambda _: self._handler_done(sample))
+        return task
+
+    @staticmethod
+    def _handler_done(sample: Sample) -> None:
+        sample.pending -= 1
+        if not sample.pending and not sample.done.done():
+            sample.done.set_result(time.perf_counter())
+
+
+class FakeGateway:
+    """Inject gateway events into a bot, as if they were received from Discord."""
+
+    def __init__(self, bot: BenchVindex) -> None:
+        self.bot = bot
+
+    def guild_create(self, payload: dict[str, typing.Any]) -> discord.Guild:
+        """Add a guild to the bot's cache."""
+        return self.bot._connection._add_guild_from_data(  # pylint: disable=protected-access
+            payload  # pyright: ignore[reportArgumentType]
+        )
+
+    def message_create(self, payload: dict[str, typing.Any]) -> Sample:
+        """Dispatch a MESSAGE_CREATE event, and return its sample.
+
+        The sample's ``done`` future is resolved once every handler finished.
+        """
+        loop = asyncio.get_running_loop()
+        sample = Sample(start=time.perf_counter(), done=loop.create_future())
+        token = current_sample.set(sample)
+        try:
+            self.bot._connection.parse_message_create(  # pylint: disable=protected-access
+                payload  # pyright: ignore[reportArgumentType]
+            )
+        finally:
+            current_sample.reset(token)
+        if not sample.pending:
+            sample.done.set_result(time.perf_counter())
+        return sample
+
+
+async def build_bot(
+    *, guilds: int, channels_per_guild: int, members_per_guild: int
+) -> tuple[BenchVindex, FakeGateway, FakeHTTPClient]:
+    """Build a bot connected to the fake gateway, HTTP API and database.
+
+    Guilds are chunked and use the default locale. Nothing is blacklisted.
+
+    Returns
+    -------
+    tuple of BenchVindex, FakeGateway and FakeHTTPClient
+        The bot, and the fakes it uses.
+    """
+    settings = Settings(token="benchmark", database_url="postgresql://benchmark@localhost/bench")
+    bot = BenchVindex(
+        settings=settings,
+        prisma_client=FakeDatabase(),  # pyright: ignore[reportArgumentType]
+    )
+    bot_user = user_payload(BOT_ID, "Vindex", bot=True)
+
+    # pylint: disable=protected-access
+    http = FakeHTTPClient(asyncio.get_running_loop(), bot_user)
+    bot.http = bot._connection.http = http
+    await bot._async_setup_hook()
+    bot._connection.user = discord.ClientUser(state=bot._connection, data=bot_user)
+    # pylint: enable=protected-access
+
+    bot.owner_id = OWNER_ID
+    bot.bot_mods = []
+    bot.services.core_settings._core = Core(  # pylint: disable=protected-access
+        id=1, notifyChannel=None, invitePermissionCode=None
+    )
+    await bot.load_extension("vindex.core.cogs.core")
+
+    gateway = FakeGateway(bot)
+    owner = user_payload(OWNER_ID, "owner")
+    for _ in range(guilds):
+        members = [member_payload(bot_user), member_payload(owner)]
+        members.extend(
+            member_payload(user_payload(user_id, f"user-{user_id}"))
+            for user_id in (snowflake() for _ in range(members_per_guild))
+        )
+        channel_ids = [snowflake() for _ in range(channels_per_guild)]
+        gateway.guild_create(guild_payload(snowflake(), channel_ids, members))
+
+    return bot, gateway, http
@@ -0,0 +1,106 @@
+"""Microbenchmark of :py:class:`~vindex.core.utils.formatting.Humanize`.
+
+Each helper is timed with the process-wide Babel locales, and with a new locale built on every
+call, as Humanize used to do. Locales are warmed up first, as the i18n service does at startup.
+
+Results are printed as JSON, so they can be compared between versions::
+
+    python -m benchmarks.humanize --language fr --output results.json
+"""
+
+import argparse
+import collections.abc
+import contextlib
+import datetime
+import json
+import platform
+import sys
+import timeit
+import typing
+
+import babel
+import babel.core
+
+from vindex import __version__
+from vindex.core import i18n
+from vindex.core.utils import formatting
+from vindex.core.utils.formatting import Humanize
+
+NOW = datetime.datetime(2024, 1, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+CALLS: dict[str, collections.abc.Callable[[], str]] = {
+    "list": lambda: Humanize.list(["alpha", "beta", "gamma", "delta"]),
+    "number": lambda: Humanize.number(1234567.891),
+    "date": lambda: Humanize.date(NOW),
+    "timedelta": lambda: Humanize.timedelta(datetime.timedelta(hours=5, minutes=3)),
+}
+"""The calls timed, by name of the helper."""
+
+
+@contextlib.contextmanager
+def uncached_locales() -> collections.abc.Iterator[None]:
+    """Make Humanize build a new Babel locale on every call."""
+    cached = formatting.get_babel_current_language
+    formatting.get_babel_current_language = lambda: babel.core.Locale.parse(
+        i18n.get_current_language()
+    )
+    try:
+        yield
+    finally:
+        formatting.get_babel_current_language = cached
+
+
+def best_of(statement: collections.abc.Callable[[], object], *, number: int, repeat: int) -> float:
+    """Return the best time of a call to ``statement`` over ``repeat`` runs, in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def run(arguments: argparse.Namespace) -> dict[str, typing.Any]:
+    """Time every helper, with and without the cached locales."""
+    i18n.warm_babel_locales()
+    i18n._current_language.set(arguments.language)  # pylint: disable=protected-access
+
+    results: dict[str, dict[str, float]] = {}
+    for name, call in CALLS.items():
+        with uncached_locales():
+            uncached = best_of(call, number=arguments.number, repeat=arguments.repeat)
+        cached = best_of(call, number=arguments.number, repeat=arguments.repeat)
+        results[name] = {"uncached_us": uncached, "cached_us": cached}
+
+    return {
+        "vindex": __version__,
+        "babel": babel.__version__,
+        "python": platform.python_version(),
+        "language": arguments.language,
+        "helpers": results,
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.humanize", description="Benchmark Vindex's Humanize helpers."
+    )
+    parser.add_argument(
+        "--language",
+        choices=[language.value for language in i18n.Languages],
+        default="fr",
+        help="Language to format in.",
+    )
+    parser.add_argument("--number", type=int, default=20_000, help="Calls per run.")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs, the best one is kept.")
+    parser.add_argument("--output", help="File to write the results to. Defaults to stdout.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    output = json.dumps(run(arguments), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,12 @@
 
 import argparse
 import asyncio
+import atexit
+import contextlib
 import functools
 import logging
-import logging.handlers
 import os
+import queue
 import signal
 import subprocess
 import sys
@@ -19,7 +21,16 @@ import uvloop
 from rich.logging import RichHandler
 
 from vindex import __version__
-from vindex.settings import read_settings
+from vindex.cluster import WorkerInfo, run_launcher
+from vindex.log import (
+    DEFAULT_QUEUE_SIZE,
+    BatchFileHandler,
+    BatchListener,
+    JSONFormatter,
+    OverloadQueueHandler,
+)
+from vindex.profiling import StartupProfiler
+from vindex.settings import Settings, read_settings
 
 if typing.TYPE_CHECKING:
     from prisma.client import Client as PrismaClient
@@ -34,21 +45,32 @@ class VindexNamespace(argparse.Namespace):
     version: bool
     disable_rich: bool
     log_level: int
+    log_json: bool
     prisma_generate: bool
     prisma_push: bool
     prisma_migrate: bool
+    profile_startup: bool
+    profile_cprofile: bool
+    clusters: int
+    shard_count: int | None
 
 
 class EnvOptions:
     """Options that can be set in the environment to control Vindex."""
 
     log_level: int
+    log_json: bool
+    log_queue_size: int
+    log_sample_rate: int
     prisma_generate: bool
     prisma_push: bool
     prisma_migrate: bool
 
     def __init__(self) -> None:
         self.log_level = int(os.environ.get("VINDEX_LOG_LEVEL", 20))
+        self.log_json = bool(int(os.environ.get("VINDEX_LOG_JSON", 0)))
+        self.log_queue_size = int(os.environ.get("VINDEX_LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        self.log_sample_rate = int(os.environ.get("VINDEX_LOG_SAMPLE_RATE", 10))
         self.prisma_generate = bool(int(os.environ.get("VINDEX_PRISMA_GENERATE", 0)))
         self.prisma_push = bool(int(os.environ.get("VINDEX_PRISMA_PUSH", 0)))
         self.prisma_migrate = bool(int(os.environ.get("VINDEX_PRISMA_MIGRATE", 0)))
@@ -76,6 +98,11 @@ def parse_arguments() -> VindexNamespace:
         metavar="[0-50]",
         help="Set the log level. Defaults to INFO (20).",
     )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="Write the log file as JSON lines.",
+    )
     parser.add_argument(
         "--prisma-generate",
         action="store_true",
@@ -94,25 +121,92 @@ def parse_arguments() -> VindexNamespace:
         action="store_true",
         help="Attempt to migrate the database. Use --prisma-push for development.",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help=(
+            "Measure the time spent in each phase of the startup, and write a report to the log "
+            "directory once the bot is ready."
+        ),
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action="store_true",
+        help="Also run cProfile over the setup hook. Implies --profile-startup.",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Run the bot as N processes, each one owning a contiguous range of shards. "
+            "Defaults to 1 (a single process)."
+        ),
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=None,
+        metavar="N",
+        help="The total number of shards. Defaults to Discord's recommendation.",
+    )
     return parser.parse_args(sys.argv[1:], namespace=VindexNamespace())
 
 
-def setup_logging(disable_rich: bool, log_level: int) -> None:
-    logging.basicConfig(
-        datefmt="%H:%M:%S",
-        format="%(name)s (%(funcName)s) : %(message)s",
-        handlers=[RichHandler(level=log_level)] if not disable_rich else [],
-        level=log_level,
+def setup_logging(
+    disable_rich: bool,
+    log_level: int,
+    log_file: str = "vindex.log",
+    *,
+    json_lines: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    sample_rate: int = 10,
+) -> None:
+    """Setup logging.
+
+    Records are only queued by the thread logging them. They are formatted and written by a
+    listener thread, in batches. Under overload, low-level records are sampled, then dropped.
+
+    Parameters
+    ----------
+    disable_rich : bool
+        Whether to not log to the console.
+    log_level : int
+        The minimum level of the logged records.
+    log_file : str
+        The name of the log file, in the log directory. Only Vindex's records are written to it.
+    json_lines : bool
+        Whether to write the log file as JSON lines.
+    queue_size : int
+        The maximum number of records waiting to be written.
+    sample_rate : int
+        One record below ``WARNING`` in this many is kept when the queue is half full.
+    """
+    file_handler = BatchFileHandler(
+        platformdirs.user_log_path("vindex", ensure_exists=True).joinpath(log_file).resolve(),
+        maxBytes=8**7,
+        backupCount=10,
     )
-    logging.getLogger("vindex").addHandler(
-        logging.handlers.RotatingFileHandler(
-            platformdirs.user_log_path("vindex", ensure_exists=True)
-            .joinpath("vindex.log")
-            .resolve(),
-            maxBytes=8**7,
-            backupCount=10,
+    file_handler.addFilter(logging.Filter("vindex"))
+    if json_lines:
+        file_handler.setFormatter(JSONFormatter())
+    handlers: list[logging.Handler] = [file_handler]
+    if not disable_rich:
+        rich_handler = RichHandler(level=log_level)
+        rich_handler.setFormatter(
+            logging.Formatter("%(name)s (%(funcName)s) : %(message)s", datefmt="%H:%M:%S")
         )
-    )
+        handlers.append(rich_handler)
+
+    log_queue: queue.Queue[typing.Any] = queue.Queue(maxsize=queue_size)
+    queue_handler = OverloadQueueHandler(log_queue, sample_rate=sample_rate)
+    listener = BatchListener(log_queue, *handlers, source=queue_handler)
+    listener.start()
+    # Runs before logging's own shutdown, so every queued record is written.
+    atexit.register(listener.stop)
+
+    logging.basicConfig(handlers=[queue_handler], level=log_level)
     for logger in ("discord", "prisma", "httpcore", "httpx"):
         logging.getLogger(logger).setLevel(logging.DEBUG if log_level <= 0 else logging.WARNING)
 
@@ -125,8 +219,15 @@ async def shutdown_handler(bot: "Vindex", received_signal: Signals | None = None
     else:
         _log.warning("Shutting down...")
 
+    # Shutting down blocks the loop, which is expected.
+    bot.services.watchdog.stop()
+    bot.services.chunking.stop()
     try:
+        await bot.services.blacklist.close()
+        await bot.services.metrics.close()
         await bot.database.disconnect()
+        if bot.replica:
+            await bot.replica.disconnect()
         _log.info("Disconnected from database.")
         await asyncio.wait_for(bot.close(), timeout=10)
         _log.debug("WebSocket closed.")
@@ -186,16 +287,32 @@ def setup_handling(bot: "Vindex", loop: asyncio.AbstractEventLoop):
         )
 
 
-async def init_prisma(url: str) -> "PrismaClient":
-    """Create, register and return a new initialized and connected Prisma client."""
-    from prisma import Client, register  # pylint: disable=import-outside-toplevel
+async def init_prisma(settings: Settings, *, replica: bool = False) -> "PrismaClient":
+    """Create, register and return a new initialized and connected Prisma client.
+
+    Repeated queries are only reported in development (when ``__debug__`` is set).
+
+    If ``replica`` is set, the client connects to the read replica instead, and is not
+    registered.
+    """
+    from prisma import register  # pylint: disable=import-outside-toplevel
     from prisma.engine.errors import (  # pylint: disable=import-outside-toplevel
         EngineConnectionError,
     )
+    from vindex.database import VindexClient  # pylint: disable=import-outside-toplevel
 
     try:
-        db = Client(datasource={"url": url})
+        db = VindexClient(
+            datasource={
+                "url": settings.database_replica_url if replica else settings.database_url
+            },
+            slow_query_threshold=settings.slow_query_threshold,
+            repeated_query_threshold=settings.repeated_query_threshold if __debug__ else None,
+        )
         await db.connect(timeout=timedelta(seconds=10))
+        if replica:
+            _log.debug("Connected to the read replica.")
+            return db
         register(db)
         _log.debug("DB has been registered.")
         return db
@@ -217,13 +334,30 @@ def main():
         env_args = EnvOptions()
     except ValueError:
         _log.error(
-            '[red]One of the "VINDEX_PRISMA_*" environment variable is invalid. Please use '
-            '"0" for "False" and "1" for "True" only.'
+            '[red]One of the "VINDEX_PRISMA_*" or "VINDEX_LOG_*" environment variable is '
+            'invalid. Please use "0" for "False" and "1" for "True" only, and numbers for sizes.'
         )
         _log.error("Exiting...")
         sys.exit(1)
 
-    setup_logging(arguments.disable_rich, env_args.log_level or arguments.log_level)
+    # Set by the launcher when running as one of many clusters.
+    cluster = WorkerInfo.from_environ()
+    setup_logging(
+        arguments.disable_rich,
+        env_args.log_level or arguments.log_level,
+        f"vindex-cluster{cluster.cluster_id}.log" if cluster else "vindex.log",
+        json_lines=arguments.log_json or env_args.log_json,
+        queue_size=env_args.log_queue_size,
+        sample_rate=env_args.log_sample_rate,
+    )
+
+    profiler = None
+    if arguments.profile_startup or arguments.profile_cprofile:
+        profiler = StartupProfiler(use_cprofile=arguments.profile_cprofile)
+        profiler.install()
+
+    def phase(name: str) -> contextlib.AbstractContextManager[typing.Any]:
+        return profiler.phase(name) if profiler else contextlib.nullcontext()
 
     if __debug__:
         _log.info("Loading .env environment variables...")
@@ -234,30 +368,75 @@ def main():
     except KeyError as exception:
         _log.error("Missing environment variable: %s", exception)
         sys.exit(1)
+    except ValueError as exception:
+        _log.error("Invalid environment variable: %s", exception)
+        sys.exit(1)
 
     # Used by Prisma
     os.environ["VINDEX_DB_URL"] = settings.database_url
 
-    if arguments.prisma_generate or env_args.prisma_generate:
-        run_command("prisma generate")
-    if arguments.prisma_push or env_args.prisma_push:
-        run_command("prisma db push")
-    if arguments.prisma_migrate or env_args.prisma_migrate:
-        run_command("prisma migrate deploy")
+    with phase("prisma commands"):
+        if arguments.prisma_generate or env_args.prisma_generate:
+            run_command("prisma generate")
+        if arguments.prisma_push or env_args.prisma_push:
+            run_command("prisma db push")
+        if arguments.prisma_migrate or env_args.prisma_migrate:
+            run_command("prisma migrate deploy")
+
+    if arguments.clusters > 1 and not cluster:
+        worker_arguments = ["--log-level", str(arguments.log_level)]
+        if arguments.disable_rich:
+            worker_arguments.append("--disable-rich")
+        if arguments.log_json:
+            worker_arguments.append("--log-json")
+        if arguments.profile_startup or arguments.profile_cprofile:
+            worker_arguments.append("--profile-startup")
+        if arguments.profile_cprofile:
+            worker_arguments.append("--profile-cprofile")
+        sys.exit(
+            run_launcher(
+                settings.token,
+                clusters=arguments.clusters,
+                shard_count=arguments.shard_count,
+                worker_arguments=worker_arguments,
+                # Prisma commands were ran once by the launcher.
+                worker_environ={
+                    "VINDEX_PRISMA_GENERATE": "0",
+                    "VINDEX_PRISMA_PUSH": "0",
+                    "VINDEX_PRISMA_MIGRATE": "0",
+                },
+            )
+        )
 
     loop = uvloop.new_event_loop()
     asyncio.set_event_loop(loop)
 
-    db = loop.run_until_complete(init_prisma(settings.database_url))
+    with phase("init_prisma"):
+        db = loop.run_until_complete(init_prisma(settings))
+        replica = None
+        if settings.database_replica_url:
+            replica = loop.run_until_complete(init_prisma(settings, replica=True))
 
     # Vindex should only imported now, after Prisma has been generated.
     # Otherwise, the Prisma client will try to be imported, and we might risk an exception.
-    from vindex.core.bot import Vindex  # pylint: disable=import-outside-toplevel
-
-    bot = Vindex(settings=settings, prisma_client=db)
+    with phase("import vindex.core.bot"):
+        from vindex.core.bot import Vindex  # pylint: disable=import-outside-toplevel
+
+    with phase("Vindex()"):
+        bot = Vindex(
+            settings=settings,
+            prisma_client=db,
+            replica_client=replica,
+            cluster=cluster,
+            shard_count=arguments.shard_count,
+        )
 
     setup_handling(bot, loop)
 
+    if profiler:
+        profiler.attach(bot)
+        loop.create_task(profiler.report_when_ready(bot))
+
     future = loop.create_task(bot.start(settings.token))
     future.add_done_callback(functools.partial(exception_handler, bot))
 
@@ -271,6 +450,8 @@ def main():
         if db.is_connected():
             _log.warning("Database was not disconnected! (bad!!!) Doing it now...")
             loop.run_until_complete(db.disconnect())
+        if replica and replica.is_connected():
+            loop.run_until_complete(replica.disconnect())
         asyncio.set_event_loop(None)
         loop.stop()
         loop.close()
@@ -0,0 +1,460 @@
+"""Run Vindex as many processes (clusters), each one owning a contiguous range of shards.
+
+The launcher starts the workers, forwards them the signals it receives and restarts the ones
+that crash. Workers run in their own session, so signals sent to the launcher's process group
+(such as Ctrl+C in a terminal) only reach them once, forwarded. It also runs an IPC hub, to
+which each worker connects to query the other clusters or dispatch events to them. Messages
+are JSON objects, one per line.
+"""
+
+import asyncio
+import collections.abc
+import dataclasses
+import hmac
+import itertools
+import json
+import logging
+import os
+import secrets
+import signal
+import sys
+import typing
+
+import discord
+import uvloop
+from discord.http import HTTPClient
+
+_log = logging.getLogger(__name__)
+
+ENV_CLUSTER_ID = "VINDEX_CLUSTER_ID"
+ENV_CLUSTER_COUNT = "VINDEX_CLUSTER_COUNT"
+ENV_SHARD_IDS = "VINDEX_SHARD_IDS"
+ENV_SHARD_COUNT = "VINDEX_SHARD_COUNT"
+ENV_IPC_ADDRESS = "VINDEX_CLUSTER_IPC"
+ENV_IPC_TOKEN = "VINDEX_CLUSTER_TOKEN"
+
+MAX_MESSAGE_SIZE = 2**20
+"""The maximum size, in bytes, of a single IPC message."""
+
+SHUTDOWN_TIMEOUT = 30.0
+"""The number of seconds workers have to exit after a signal, before being killed."""
+
+MAX_RESTART_DELAY = 60.0
+"""The maximum number of seconds to wait before restarting a crashed worker."""
+
+HEALTHY_UPTIME = 300.0
+"""The number of seconds a worker must run for its restart delay to be reset."""
+
+type Message = dict[str, typing.Any]
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkerInfo:
+    """Information given by the launcher to a worker, through its environment."""
+
+    cluster_id: int
+    cluster_count: int
+    shard_ids: list[int]
+    shard_count: int
+    ipc_host: str
+    ipc_port: int
+    ipc_token: str
+
+    @classmethod
+    def from_environ(cls) -> "WorkerInfo | None":
+        """Read the worker's information from the environment.
+
+        Returns
+        -------
+        WorkerInfo or None
+            The worker's information. None if the process is not a worker.
+        """
+        if ENV_CLUSTER_ID not in os.environ:
+            return None
+        host, port = os.environ[ENV_IPC_ADDRESS].rsplit(":", 1)
+        return cls(
+            cluster_id=int(os.environ[ENV_CLUSTER_ID]),
+            cluster_count=int(os.environ[ENV_CLUSTER_COUNT]),
+            shard_ids=[int(shard_id) for shard_id in os.environ[ENV_SHARD_IDS].split(",")],
+            shard_count=int(os.environ[ENV_SHARD_COUNT]),
+            ipc_host=host,
+            ipc_port=int(port),
+            ipc_token=os.environ[ENV_IPC_TOKEN],
+        )
+
+    def to_environ(self) -> dict[str, str]:
+        """Return the environment variables describing the worker."""
+        return {
+            ENV_CLUSTER_ID: str(self.cluster_id),
+            ENV_CLUSTER_COUNT: str(self.cluster_count),
+            ENV_SHARD_IDS: ",".join(map(str, self.shard_ids)),
+            ENV_SHARD_COUNT: str(self.shard_count),
+            ENV_IPC_ADDRESS: f"{self.ipc_host}:{self.ipc_port}",
+            ENV_IPC_TOKEN: self.ipc_token,
+        }
+
+
+def shard_ranges(shard_count: int, clusters: int) -> list[range]:
+    """Split shards into contiguous ranges of (almost) equal size.
+
+    Parameters
+    ----------
+    shard_count : int
+        The total number of shards.
+    clusters : int
+        The number of ranges to create. Cannot be greater than the number of shards.
+
+    Returns
+    -------
+    list of range
+        The shards of each cluster.
+    """
+    if not 0 < clusters <= shard_count:
+        raise ValueError("There must be between 1 and shard_count clusters.")
+    size, extra = divmod(shard_count, clusters)
+    ranges: list[range] = []
+    start = 0
+    for cluster_id in range(clusters):
+        end = start + size + (cluster_id < extra)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+async def fetch_shard_count(token: str) -> int:
+    """Fetch the number of shards recommended by Discord."""
+    http = HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shard_count, _ = await http.get_bot_gateway()
+        return shard_count
+    finally:
+        await http.close()
+
+
+async def send_message(writer: asyncio.StreamWriter, message: Message) -> None:
+    """Send a message through an IPC connection."""
+    writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_messages(
+    reader: asyncio.StreamReader,
+) -> collections.abc.AsyncIterator[Message]:
+    """Read the messages of an IPC connection, until it is closed."""
+    while line := await reader.readline():
+        try:
+            yield json.loads(line)
+        except ValueError:
+            _log.warning("Received an invalid IPC message, ignoring.")
+
+
+class ClusterHub:
+    """The IPC hub, ran by the launcher.
+
+    Queries are sent to every connected worker, and their replies are gathered and sent back to
+    the worker that made the query. Events are forwarded to every other worker.
+    """
+
+    token: str
+    """The secret workers must give when connecting."""
+
+    _workers: dict[int, asyncio.StreamWriter]
+    _pending: dict[int, tuple[dict[int, typing.Any], asyncio.Future[None]]]
+    _tasks: set[asyncio.Task[None]]
+
+    def __init__(self, token: str, *, on_stop: collections.abc.Callable[[], None]) -> None:
+        self.token = token
+        self.on_stop = on_stop
+        self._workers = {}
+        self._pending = {}
+        self._tasks = set()
+        self._nonces = itertools.count()
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> tuple[str, int]:
+        """Start listening for workers on the loopback interface.
+
+        Returns
+        -------
+        tuple of str and int
+            The host and port the hub listens on.
+        """
+        self._server = await asyncio.start_server(
+            self._handle, "127.0.0.1", 0, limit=MAX_MESSAGE_SIZE
+        )
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return host, port
+
+    async def close(self) -> None:
+        """Stop the hub and close every connection."""
+        if self._server:
+            self._server.close()
+        for writer in self._workers.values():
+            writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        messages = read_messages(reader)
+        identify = await anext(messages, None)
+        if (
+            not identify
+            or identify.get("op") != "identify"
+            or not hmac.compare_digest(str(identify.get("token")), self.token)
+        ):
+            _log.warning("Refused an IPC connection that did not identify correctly.")
+            writer.close()
+            return
+
+        cluster_id = int(identify["cluster"])
+        self._workers[cluster_id] = writer
+        _log.debug("Cluster %s connected to the IPC hub.", cluster_id)
+        try:
+            async for message in messages:
+                match message.get("op"):
+                    case "query":
+                        task = asyncio.create_task(self._query(writer, message))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+                    case "reply":
+                        self._reply(cluster_id, message)
+                    case "dispatch":
+                        await self._broadcast(message, exclude=cluster_id)
+                    case "stop":
+                        self.on_stop()
+                    case op:
+                        _log.warning(
+                            "Cluster %s sent an unknown IPC operation: %s", cluster_id, op
+                        )
+        except ConnectionError:
+            pass
+        finally:
+            if self._workers.get(cluster_id) is writer:
+                del self._workers[cluster_id]
+            # Queries waiting for this cluster won't get its reply.
+            for replies, future in self._pending.values():
+                replies.setdefault(cluster_id, None)
+                self._maybe_complete(replies, future)
+            writer.close()
+            _log.debug("Cluster %s disconnected from the IPC hub.", cluster_id)
+
+    async def _query(self, origin: asyncio.StreamWriter, message: Message) -> None:
+        nonce = next(self._nonces)
+        replies: dict[int, typing.Any] = {}
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending[nonce] = (replies, future)
+        try:
+            await self._broadcast(
+                {"op": "query", "nonce": nonce, "name": message["name"], "data": message["data"]}
+            )
+            await asyncio.wait_for(future, timeout=float(message.get("timeout", 5.0)))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            del self._pending[nonce]
+
+        with_values = {str(cluster_id): value for cluster_id, value in replies.items()}
+        try:
+            await send_message(
+                origin, {"op": "result", "nonce": message["nonce"], "values": with_values}
+            )
+        except ConnectionError:
+            pass
+
+    def _reply(self, cluster_id: int, message: Message) -> None:
+        pending = self._pending.get(message["nonce"])
+        if pending is None:
+            return
+        replies, future = pending
+        replies[cluster_id] = message.get("value")
+        self._maybe_complete(replies, future)
+
+    def _maybe_complete(
+        self, replies: dict[int, typing.Any], future: asyncio.Future[None]
+    ) -> None:
+        if self._workers.keys() <= replies.keys() and not future.done():
+            future.set_result(None)
+
+    async def _broadcast(self, message: Message, *, exclude: int | None = None) -> None:
+        for cluster_id, writer in list(self._workers.items()):
+            if cluster_id == exclude:
+                continue
+            try:
+                await send_message(writer, message)
+            except ConnectionError:
+                _log.warning("Failed to send an IPC message to cluster %s.", cluster_id)
+
+
+class Launcher:
+    """Start and supervise the workers."""
+
+    clusters: int
+    """The number of workers to start."""
+
+    shard_count: int | None
+    """The total number of shards. If None, Discord's recommendation is used."""
+
+    worker_arguments: list[str]
+    """Command line arguments given to each worker."""
+
+    worker_environ: dict[str, str]
+    """Environment variables given to each worker, on top of the launcher's ones."""
+
+    _processes: dict[int, asyncio.subprocess.Process]
+
+    def __init__(
+        self,
+        *,
+        token: str,
+        clusters: int,
+        shard_count: int | None = None,
+        worker_arguments: list[str] | None = None,
+        worker_environ: dict[str, str] | None = None,
+    ) -> None:
+        self.token = token
+        self.clusters = clusters
+        self.shard_count = shard_count
+        self.worker_arguments = worker_arguments or []
+        self.worker_environ = worker_environ or {}
+        self.hub = ClusterHub(secrets.token_urlsafe(32), on_stop=self.stop)
+        self._processes = {}
+        self._stopping = False
+        self._killed = False
+
+    async def run(self) -> int:
+        """Start the workers, and wait for all of them to exit.
+
+        Returns
+        -------
+        int
+            The exit code of the launcher. 0 if every worker stopped in time once asked to.
+        """
+        shard_count = self.shard_count or await fetch_shard_count(self.token)
+        if self.clusters > shard_count:
+            # A cluster holds at least one shard.
+            _log.warning(
+                "%s clusters were asked for, but there are only %s shards. Starting %s clusters.",
+                self.clusters,
+                shard_count,
+                shard_count,
+            )
+            self.clusters = shard_count
+        ranges = shard_ranges(shard_count, self.clusters)
+        host, port = await self.hub.start()
+        _log.info(
+            "Starting %s clusters for %s shards, IPC hub on %s:%s.",
+            self.clusters,
+            shard_count,
+            host,
+            port,
+        )
+
+        loop = asyncio.get_running_loop()
+        signals = [signal.SIGINT, signal.SIGTERM]
+        if sys.platform != "win32":
+            signals.append(signal.SIGHUP)
+        for sent_signal in signals:
+            loop.add_signal_handler(sent_signal, self.stop, sent_signal)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for cluster_id, shards in enumerate(ranges):
+                    info = WorkerInfo(
+                        cluster_id=cluster_id,
+                        cluster_count=self.clusters,
+                        shard_ids=list(shards),
+                        shard_count=shard_count,
+                        ipc_host=host,
+                        ipc_port=port,
+                        ipc_token=self.hub.token,
+                    )
+                    group.create_task(self._supervise(info))
+        finally:
+            await self.hub.close()
+        return 1 if self._killed else 0
+
+    def stop(self, sent_signal: signal.Signals = signal.SIGTERM) -> None:
+        """Forward a signal to every worker, so they shut down, and kill the late ones."""
+        if self._stopping:
+            return
+        self._stopping = True
+        _log.warning("Stopping every cluster (%s)...", sent_signal.name)
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.send_signal(sent_signal)
+        asyncio.get_running_loop().call_later(SHUTDOWN_TIMEOUT, self._kill)
+
+    def _kill(self) -> None:
+        for cluster_id, process in self._processes.items():
+            if process.returncode is None:
+                _log.error("Cluster %s did not stop in time, killing it.", cluster_id)
+                process.kill()
+                self._killed = True
+
+    async def _supervise(self, info: WorkerInfo) -> None:
+        loop = asyncio.get_running_loop()
+        restarts = 0
+        while not self._stopping:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "vindex",
+                *self.worker_arguments,
+                env={**os.environ, **self.worker_environ, **info.to_environ()},
+                # Signals are forwarded by the launcher.
+                start_new_session=True,
+            )
+            started = loop.time()
+            self._processes[info.cluster_id] = process
+            _log.info(
+                "Started cluster %s (PID %s) with shards %s to %s.",
+                info.cluster_id,
+                process.pid,
+                info.shard_ids[0],
+                info.shard_ids[-1],
+            )
+
+            code = await process.wait()
+            if self._stopping or code == 0:
+                _log.info("Cluster %s exited with code %s.", info.cluster_id, code)
+                return
+
+            if loop.time() - started >= HEALTHY_UPTIME:
+                restarts = 0
+            delay = min(2**restarts, MAX_RESTART_DELAY)
+            restarts += 1
+            _log.error(
+                "Cluster %s exited with code %s. Restarting it in %ss.",
+                info.cluster_id,
+                code,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+
+def run_launcher(
+    token: str,
+    *,
+    clusters: int,
+    shard_count: int | None,
+    worker_arguments: list[str],
+    worker_environ: dict[str, str],
+) -> int:
+    """Run the launcher until every worker exited.
+
+    Returns
+    -------
+    int
+        The exit code of the launcher.
+    """
+    launcher = Launcher(
+        token=token,
+        clusters=clusters,
+        shard_count=shard_count,
+        worker_arguments=worker_arguments,
+        worker_environ=worker_environ,
+    )
+    try:
+        return asyncio.run(launcher.run(), loop_factory=uvloop.new_event_loop)
+    except discord.DiscordException:
+        _log.error("Failed to fetch the recommended number of shards.", exc_info=True)
+        return 1
@@ -47,7 +47,7 @@ class Dev(commands.Cog):
         # but the bot is still in it.
         all_guilds = {str(guild.id): guild for guild in self.bot.guilds}
 
-        registered_guilds = await self.bot.database.guild.find_many(
+        registered_guilds = await self.bot.reader().guild.find_many(
             where={"id": {"in": list(all_guilds.keys())}}
         )
 
@@ -1,14 +1,15 @@
+import asyncio
 import logging
+import time
 import typing
 
 import discord
 from discord.ext import commands
 
-from prisma.models import GuildAllowance
 from vindex.core.checks import is_bot_mod
 from vindex.core.i18n import Translator
-from vindex.core.utils import AsyncIterator
 from vindex.core.utils.prompt import ConfirmView
+from vindex.database import query_scope
 
 from .messages import falx_check, falx_join, falx_leave, falx_startup
 
@@ -16,11 +17,33 @@ if typing.TYPE_CHECKING:
     from prisma import Client
     from vindex.core.bot import Vindex
     from vindex.core.core_types import Context
+    from vindex.core.services.allowance import GuildAllowanceService
 
 
 _ = Translator("Falx", __file__)
 _log = logging.getLogger(__name__)
 
+LEAVE_CONCURRENCY = 5
+"""The maximum number of guilds left at the same time during the startup sweep."""
+
+SEED_TIMEOUT = 600.0
+"""The number of seconds each cluster has to seed its guilds."""
+
+
+class _Seed:
+    """A seed started from this cluster, and the progress reported by each cluster."""
+
+    __slots__ = ("message", "total", "done")
+
+    message: discord.Message
+    total: int
+    done: dict[int, int]
+
+    def __init__(self, message: discord.Message, total: int) -> None:
+        self.message = message
+        self.total = total
+        self.done = {}
+
 
 class Falx(commands.Cog):
     """The guild authorization layer of Vindex."""
@@ -28,25 +51,85 @@ class Falx(commands.Cog):
     bot: "Vindex"
     db: "Client"
 
+    _seeds: dict[int, _Seed]
+
     def __init__(self, bot: "Vindex") -> None:
         self.bot = bot
         self.db = bot.database
+        self._seeds = {}
         super().__init__()
 
-    async def is_guild_allowed(self, guild_id: int) -> bool:
+    @property
+    def allowance(self) -> "GuildAllowanceService":
+        """The service holding the allowance of every guild."""
+        return self.bot.services.allowance
+
+    def is_guild_allowed(self, guild_id: int) -> bool:
         """Indicates if the guild is allowed to use the bot or not.
 
         This will also return `False` if the guild has no record in the database.
         """
-        guild_data = await GuildAllowance.prisma().find_unique(where={"id": str(guild_id)})
-        if not guild_data:
-            return False
-        return guild_data.allowed
+        return self.allowance.is_allowed(guild_id)
 
-    async def is_guild_known(self, guild_id: int) -> bool:
+    def is_guild_known(self, guild_id: int) -> bool:
         """Indicates if the guild is known to the the GuildAllowance layer."""
-        guild_data = await GuildAllowance.prisma().find_unique(where={"id": str(guild_id)})
-        return guild_data is not None
+        return self.allowance.is_known(guild_id)
+
+    async def cog_load(self) -> None:
+        self.bot.services.cluster.add_query("falx_seed", self.seed_guilds)
+        self.bot.services.cluster.add_listener("falx_seed_progress", self._on_seed_progress)
+
+    async def cog_unload(self) -> None:
+        self.bot.services.cluster.remove_query("falx_seed")
+        self.bot.services.cluster.remove_listener("falx_seed_progress", self._on_seed_progress)
+
+    async def seed_guilds(self, data: dict[str, typing.Any]) -> int:
+        """Allow every guild of this cluster. Answers the ``falx_seed`` cluster query.
+
+        Parameters
+        ----------
+        data : dict
+            The query's data, with the ID of the user seeding the guilds as ``author_id`` and
+            the ID of the seed as ``seed_id``.
+
+        Returns
+        -------
+        int
+            The number of guilds allowed.
+        """
+        author_id = int(data["author_id"])
+        seed_id = int(data["seed_id"])
+        cluster = self.bot.services.cluster
+        reasons = {
+            guild.id: f"Automatic seeding of {guild.name} by {author_id}"
+            for guild in self.bot.guilds
+        }
+
+        async def on_progress(done: int, total: int) -> None:
+            progress = {"seed_id": seed_id, "cluster_id": cluster.cluster_id, "done": done}
+            # Events are not dispatched to this cluster, which may be the one seeding.
+            await self._on_seed_progress(progress)
+            await cluster.dispatch("falx_seed_progress", progress)
+
+        return await self.allowance.bulk_set(
+            reasons, allowed=True, author_id=author_id, on_progress=on_progress
+        )
+
+    async def _on_seed_progress(self, data: dict[str, int]) -> None:
+        seed = self._seeds.get(data["seed_id"])
+        if seed is None:
+            # The seed was started from another cluster.
+            return
+        seed.done[data["cluster_id"]] = data["done"]
+        try:
+            await seed.message.edit(
+                content=_("Seeding guilds... {done}/{total}").format(
+                    done=sum(seed.done.values()), total=seed.total
+                )
+            )
+        except discord.HTTPException:
+            # The progress is informative, failing to show it must not stop the seed.
+            _log.warning("Failed to show the progress of seed %s.", data["seed_id"], exc_info=True)
 
     @commands.group(name="falx")
     @is_bot_mod()
@@ -65,25 +148,23 @@ class Falx(commands.Cog):
             if not confirmed:
                 return
 
-        count = 0
-        for guild in self.bot.guilds:
-            await GuildAllowance.prisma().upsert(
-                where={"id": str(guild.id)},
-                data={
-                    "create": {
-                        "id": str(guild.id),
-                        "allowed": True,
-                        "allowanceReason": f"Automatic seeding of {guild.name} by {ctx.author.id}",
-                        "createdById": str(ctx.author.id),
-                    },
-                    "update": {
-                        "allowed": True,
-                        "allowanceReason": f"Automatic seeding of {guild.name} by {ctx.author.id}",
-                        "createdBy": {"connect": {"id": str(ctx.author.id)}},
-                    },
-                },
+        cluster = self.bot.services.cluster
+        total = await cluster.guild_count()
+        progress_message = await ctx.send(_("Seeding {total} guilds...").format(total=total))
+
+        # Created once, so the clusters do not race to create it.
+        await self.allowance.ensure_author(ctx.author.id)
+        # Each cluster seeds the guilds it holds, and reports its progress back to this one.
+        self._seeds[ctx.message.id] = _Seed(progress_message, total)
+        try:
+            counts = await cluster.query(
+                "falx_seed",
+                {"author_id": ctx.author.id, "seed_id": ctx.message.id},
+                timeout=SEED_TIMEOUT,
             )
-            count += 1
+        finally:
+            del self._seeds[ctx.message.id]
+        count = sum(count for count in counts.values() if count)
 
         await ctx.send(_("Done. {count} guilds were succesfully seeded.").format(count=count))
 
@@ -106,33 +187,11 @@ class Falx(commands.Cog):
 
         guild_id = guild_or_id if isinstance(guild_or_id, int) else guild_or_id.id
 
-        guild_data = await GuildAllowance.prisma().find_first(where={"id": str(guild_id)})
-        if guild_data and guild_data.allowed:
+        if self.is_guild_allowed(guild_id):
             await ctx.send(_("This guild is already allowed."))
             return
 
-        await GuildAllowance.prisma().upsert(
-            where={"id": str(guild_id)},
-            data={
-                "create": {
-                    "id": str(guild_id),
-                    "allowed": True,
-                    "allowanceReason": reason,
-                    "createdBy": {
-                        "connect": {"id": str(ctx.author.id)},
-                        "create": {"id": str(ctx.author.id)},
-                    },
-                },
-                "update": {
-                    "allowed": True,
-                    "allowanceReason": reason,
-                    "createdBy": {
-                        "connect": {"id": str(ctx.author.id)},
-                        "create": {"id": str(ctx.author.id)},
-                    },
-                },
-            },
-        )
+        await self.allowance.allow(guild_id, reason, author_id=ctx.author.id)
         await ctx.send(_("This guild is now allowed."))
 
     @cmd_falx.command(name="disallow", aliases=["remove"])
@@ -158,33 +217,11 @@ class Falx(commands.Cog):
 
         guild_id = guild_or_id if isinstance(guild_or_id, int) else guild_or_id.id
 
-        guild_data = await GuildAllowance.prisma().find_first(where={"id": str(guild_id)})
-        if not guild_data or not guild_data.allowed:
+        if not self.is_guild_allowed(guild_id):
             await ctx.send(_("This guild is already disallowed."))
             return
 
-        await GuildAllowance.prisma().upsert(
-            where={"id": str(guild_id)},
-            data={
-                "create": {
-                    "id": str(guild_id),
-                    "allowed": False,
-                    "allowanceReason": reason,
-                    "createdBy": {
-                        "connect": {"id": str(ctx.author.id)},
-                        "create": {"id": str(ctx.author.id)},
-                    },
-                },
-                "update": {
-                    "allowed": False,
-                    "allowanceReason": reason,
-                    "createdBy": {
-                        "connect": {"id": str(ctx.author.id)},
-                        "create": {"id": str(ctx.author.id)},
-                    },
-                },
-            },
-        )
+        await self.allowance.disallow(guild_id, reason, author_id=ctx.author.id)
 
         fetched_guild = self.bot.get_guild(guild_id)
         if fetched_guild:
@@ -207,7 +244,7 @@ class Falx(commands.Cog):
         """
         guild_id = guild_or_id if isinstance(guild_or_id, int) else guild_or_id.id
 
-        record = await GuildAllowance.prisma().delete(where={"id": str(guild_id)})
+        record = await self.allowance.forget(guild_id)
 
         if record:
             await ctx.send(_("Record deleted."))
@@ -225,9 +262,7 @@ class Falx(commands.Cog):
         """
         guild_id = guild_or_id if isinstance(guild_or_id, int) else guild_or_id.id
 
-        record = await GuildAllowance.prisma().find_unique(
-            where={"id": str(guild_id)}, include={"createdBy": True}
-        )
+        record = await self.allowance.get(guild_id)
         if not record:
             await ctx.send(_("No record found."))
             return
@@ -240,19 +275,46 @@ class Falx(commands.Cog):
         """
         await self.bot.wait_until_ready()
 
-        unknown_guilds: list[discord.Guild] = []
-        is_disallowed: list[discord.Guild] = []
+        timer_start = time.perf_counter()
+        guilds = {guild.id: guild for guild in self.bot.guilds}
+        with query_scope("Falx startup sweep"):
+            await self.allowance.refresh(guilds.keys())
+        _log.info(
+            "Fetched allowance of %s guilds in %.2fs.",
+            len(guilds),
+            time.perf_counter() - timer_start,
+        )
 
-        async for guild in AsyncIterator(self.bot.guilds):
-            # I shall thank you Fixator10, for teaching me how to properly use async iterators. :)
-            if not await self.is_guild_known(guild.id):
-                unknown_guilds.append(guild)
-                continue
-            if not await self.is_guild_allowed(guild.id):
-                is_disallowed.append(guild)
+        timer_start = time.perf_counter()
+        known_ids = {guild_id for guild_id in guilds if self.is_guild_known(guild_id)}
+        allowed_ids = {guild_id for guild_id in known_ids if self.is_guild_allowed(guild_id)}
+        unknown_guilds = [guilds[guild_id] for guild_id in guilds.keys() - known_ids]
+        is_disallowed = [guilds[guild_id] for guild_id in known_ids - allowed_ids]
+        _log.info(
+            "Sorted guilds in %.2fs: %s unknown, %s disallowed.",
+            time.perf_counter() - timer_start,
+            len(unknown_guilds),
+            len(is_disallowed),
+        )
 
-        async for unallowed_guild in AsyncIterator(is_disallowed):
-            await unallowed_guild.leave()
+        timer_start = time.perf_counter()
+        semaphore = asyncio.Semaphore(LEAVE_CONCURRENCY)
+
+        async def leave(guild: discord.Guild) -> None:
+            async with semaphore:
+                try:
+                    await guild.leave()
+                except discord.HTTPException:
+                    _log.error("Failed to leave guild %s.", guild.id, exc_info=True)
+
+        async with asyncio.TaskGroup() as group:
+            for unallowed_guild in is_disallowed:
+                group.create_task(leave(unallowed_guild))
+        _log.info(
+            "Left %s disallowed guilds in %.2fs.",
+            len(is_disallowed),
+            time.perf_counter() - timer_start,
+        )
 
         if unknown_guilds or is_disallowed:
             await self.bot.core_notify(embeds=[falx_startup(is_disallowed, unknown_guilds)])
@@ -260,10 +322,10 @@ class Falx(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
         """Handle guild join events."""
-        allowed = await self.is_guild_allowed(guild.id)
+        allowed = self.is_guild_allowed(guild.id)
 
-        if not guild.chunked:
-            await guild.chunk()  # used for members info
+        # Used for members info
+        await self.bot.services.chunking.wait_chunked(guild, priority=True)
 
         await self.bot.core_notify(embeds=[falx_join(guild, allowed)])
         if not allowed:
@@ -272,21 +334,12 @@ class Falx(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild):
         """Handle guild leave events."""
-        allowed = await self.is_guild_allowed(guild.id)
+        allowed = self.is_guild_allowed(guild.id)
 
         if not allowed:
             # We already sent the on_guild_join embed that is above. No need for the leave embed.
             return
 
-        await GuildAllowance.prisma().update(
-            where={"id": str(guild.id)},
-            data={
-                "allowed": False,
-                "allowanceReason": "Guild was left, allowance removed by bot.",
-            },
-        )
-
-        if not guild.chunked:
-            await guild.chunk()  # used for members info
+        await self.allowance.disallow(guild.id, "Guild was left, allowance removed by bot.")
 
         await self.bot.core_notify(embeds=[falx_leave(guild)])
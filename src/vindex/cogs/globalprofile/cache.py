@@ -0,0 +1,127 @@
+import collections.abc
+import datetime
+import typing
+
+import discord
+from discord.utils import MISSING
+
+from prisma.models import Profile
+from vindex.core.utils.batching import ModelLoader
+from vindex.core.utils.caching import TTLCache
+
+type EmbedKey = tuple[int, str, str, datetime.datetime]
+"""User ID, user name, language and profile's last update."""
+
+
+class ProfileCache:
+    """Read-through cache of global profiles, and of the embeds rendered from them.
+
+    Profiles are kept for a limited time, so edits made elsewhere, such as by another cluster,
+    are seen once the cached profile expires: the TTL bounds how stale a profile can be. Rendered
+    embeds are keyed by the profile's ``updatedAt``, so an edited profile is never rendered from
+    an outdated embed.
+    """
+
+    ttl: float
+    """The number of seconds profiles are cached."""
+
+    profiles: TTLCache[int, Profile | None]
+    embeds: TTLCache[EmbedKey, discord.Embed]
+    loader: ModelLoader[Profile]
+    """Loader merging the profile queries made at the same time. May read from a replica."""
+    primary_loader: ModelLoader[Profile]
+    """Same as ``loader``, always reading from the primary database."""
+
+    hits: int
+    """Profile lookups answered from the cache."""
+    misses: int
+    """Profile lookups that queried the database."""
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        ttl: float = 600.0,
+        reader: collections.abc.Callable[[], typing.Any] | None = None,
+    ) -> None:
+        """Parameters
+        ----------
+        max_size : int
+            The maximum number of profiles, and of embeds, cached.
+        ttl : float
+            The number of seconds profiles and embeds are cached.
+        reader : Callable, optional
+            A function returning the Prisma client to read profiles from, such as
+            :py:meth:`vindex.core.bot.Vindex.reader`. Defaults to the registered client.
+        """
+        self.ttl = ttl
+        self.profiles = TTLCache(max_size=max_size)
+        self.embeds = TTLCache(max_size=max_size)
+        self.loader = ModelLoader(Profile, client=reader)
+        self.primary_loader = ModelLoader(Profile)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int, /) -> Profile | None:
+        """Get the profile of a user, from the cache if possible.
+
+        Returns
+        -------
+        prisma.models.Profile or None
+            The profile. None if the user has no profile.
+        """
+        profile = self.profiles.get(user_id)
+        if profile is not MISSING:
+            self.hits += 1
+            return profile
+        self.misses += 1
+        return await self.fetch(user_id)
+
+    async def fetch(self, user_id: int, /, *, fresh: bool = False) -> Profile | None:
+        """Read the profile of a user from the database, and cache it.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user.
+        fresh : bool
+            Whether to read from the primary database, to get the latest version of the profile.
+
+        Returns
+        -------
+        prisma.models.Profile or None
+            The profile. None if the user has no profile.
+        """
+        loader = self.primary_loader if fresh else self.loader
+        profile = await loader.load(user_id)
+        self.put(user_id, profile)
+        return profile
+
+    def put(self, user_id: int, profile: Profile | None, /) -> None:
+        """Cache the profile of a user.
+
+        A profile older than the cached one is ignored.
+        """
+        cached = self.profiles.get(user_id)
+        if profile and cached and cached.updatedAt > profile.updatedAt:
+            return
+        self.profiles.put(user_id, profile, self.ttl)
+
+    def invalidate(self, user_id: int, /) -> None:
+        """Remove the profile of a user from the cache. Must be called after editing a profile."""
+        self.profiles.pop(user_id)
+
+    def get_embed(self, key: EmbedKey, /) -> discord.Embed | None:
+        """Get a copy of a rendered embed, if cached."""
+        embed = self.embeds.get(key)
+        return None if embed is MISSING else embed.copy()
+
+    def put_embed(self, key: EmbedKey, embed: discord.Embed, /) -> discord.Embed:
+        """Cache a rendered embed, and return a copy of it."""
+        self.embeds.put(key, embed, self.ttl)
+        return embed.copy()
+
+    def clear(self) -> None:
+        """Remove every cached profile and embed."""
+        self.profiles.clear()
+        self.embeds.clear()
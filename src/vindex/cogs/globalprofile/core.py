@@ -5,9 +5,10 @@ from discord import app_commands
 from discord.ext import commands
 
 from prisma.models import Profile
-from vindex.core.i18n import Translator
+from vindex.core.i18n import Translator, get_current_language
 from vindex.core.utils.formatting import Humanize
 
+from .cache import ProfileCache
 from .components import ProfileEditView
 
 if typing.TYPE_CHECKING:
@@ -28,17 +29,27 @@ class GlobalProfile(commands.Cog):
 
     bot: "Vindex"
 
+    cache: ProfileCache
+
     def __init__(self, bot: "Vindex") -> None:
         self.bot = bot
+        self.cache = ProfileCache(reader=bot.reader)
         super().__init__()
 
     def build_profile(self, user: discord.abc.User, profile: Profile) -> discord.Embed:
-        embed = discord.Embed(
-            title=_("Profile of {user}").format(user=user.name),
-            description=profile.description or _("No description"),
-            color=discord.Color.blurple(),
-        )
-
+        key = (user.id, user.name, get_current_language(), profile.updatedAt)
+        embed = self.cache.get_embed(key)
+        if embed is None:
+            embed = self.cache.put_embed(
+                key,
+                discord.Embed(
+                    title=_("Profile of {user}").format(user=user.name),
+                    description=profile.description or _("No description"),
+                    color=discord.Color.blurple(),
+                ),
+            )
+
+        # The footer is relative to now, and is the only part not cached.
         update_delta = discord.utils.utcnow() - profile.updatedAt
         embed.set_footer(
             text=_("Last updated {date} ago").format(date=Humanize.timedelta(update_delta))
@@ -51,7 +62,7 @@ class GlobalProfile(commands.Cog):
         if ctx.subcommand_passed:
             return
         if user:
-            profile = await Profile.prisma().find_unique(where={"id": str(user.id)})
+            profile = await self.cache.get(user.id)
             if profile is None:
                 return await ctx.send(_("This user does not have a profile yet!"))
             return await ctx.send(embed=self.build_profile(user, profile))
@@ -63,7 +74,7 @@ class GlobalProfile(commands.Cog):
     async def cmd_profile_get(self, ctx: "Context", *, look_user: discord.User | None = None):
         """Show the profile of an user."""
         user = look_user or ctx.author
-        profile = await Profile.prisma().find_unique(where={"id": str(user.id)})
+        profile = await self.cache.get(user.id)
         if profile is None:
             if user.id == ctx.author.id:
                 return await ctx.send(_("You do not have a profile yet!"))
@@ -73,7 +84,8 @@ class GlobalProfile(commands.Cog):
     @cmd_profile.command("edit")
     async def cmd_profile_edit(self, ctx: "Context"):
         """Set your profile basic informations."""
-        profile = await Profile.prisma().find_unique(where={"id": str(ctx.author.id)})
+        # Always edit the latest version of the profile.
+        profile = await self.cache.fetch(ctx.author.id, fresh=True)
         if not profile:
             return await ctx.send(_("You do not have a profile yet!"))
         view = ProfileEditView(profile)
@@ -1,7 +1,9 @@
+import collections.abc
 import logging
 import pathlib
 import pkgutil
 import re
+import time
 import typing
 from contextlib import suppress
 
@@ -23,10 +25,12 @@ from vindex import __version__ as vindex_version
 from vindex.core.core_types import Context, SendMethodDict
 from vindex.core.i18n import Translator, set_language_from_guild
 from vindex.core.services.provider import ServiceProvider
+from vindex.database import get_query_scope, query_scope
 
 if typing.TYPE_CHECKING:
     from datetime import datetime
 
+    from vindex.cluster import WorkerInfo
     from vindex.settings import Settings
 
 _log = logging.getLogger(__name__)
@@ -83,6 +87,22 @@ class VindexTree(app_commands.CommandTree["Vindex"]):
         _log.error("Error inside the app commands tree", exc_info=True)
         return await super().on_error(interaction, error)
 
+    async def _call(self, interaction: Interaction["Vindex"]) -> None:
+        start = time.perf_counter()
+        name = (interaction.data or {}).get("name", "unknown")
+        autocomplete = interaction.type is discord.InteractionType.autocomplete
+        try:
+            with query_scope(f"{'autocomplete' if autocomplete else 'app command'} {name}"):
+                await super()._call(interaction)
+        finally:
+            # Autocompletes run many times per command, they would skew its latency.
+            if interaction.command and not autocomplete:
+                self.client.services.metrics.observe_command(
+                    interaction.command.qualified_name,
+                    interaction.command_failed,
+                    time.perf_counter() - start,
+                )
+
 
 class Vindex(commands.AutoShardedBot):
     """Vindex: Discord Bot made for DCS communities
@@ -96,7 +116,15 @@ class Vindex(commands.AutoShardedBot):
 
     bot_mods: list[int]
 
-    def __init__(self, settings: "Settings", prisma_client: "prisma.Prisma") -> None:
+    def __init__(
+        self,
+        settings: "Settings",
+        prisma_client: "prisma.Prisma",
+        *,
+        replica_client: "prisma.Prisma | None" = None,
+        cluster: "WorkerInfo | None" = None,
+        shard_count: int | None = None,
+    ) -> None:
         """Parameters
         ----------
         settings: Settings
@@ -104,12 +132,22 @@ class Vindex(commands.AutoShardedBot):
         prisma_client: prisma.Prisma
             The Prisma client to use for the bot.
             The client MUST be connected.
+        replica_client: prisma.Prisma, optional
+            A connected Prisma client of a read replica of the database, used by
+            :py:meth:`reader`.
+        cluster: WorkerInfo, optional
+            The cluster this instance is, when running in cluster mode. Only the cluster's
+            shards are started.
+        shard_count: int, optional
+            The total number of shards, when not running in cluster mode. Defaults to Discord's
+            recommendation.
         """
         if not prisma_client.is_connected():
             raise ValueError("The Prisma client must be connected before creating the bot.")
 
         self.settings = settings
         self.database = prisma_client
+        self.replica = replica_client
         super().__init__(
             commands.when_mentioned,
             tree_cls=VindexTree,
@@ -119,17 +157,70 @@ class Vindex(commands.AutoShardedBot):
             allowed_mentions=discord.AllowedMentions(
                 everyone=False, roles=False, users=True, replied_user=True
             ),
+            shard_ids=cluster.shard_ids if cluster else None,
+            shard_count=cluster.shard_count if cluster else shard_count,
         )
-        self.services = ServiceProvider(self)
+        self.services = ServiceProvider(self, cluster)
         self._shutdown = 0
 
         self.add_check(self.check_is_blacklisted)
         self.add_check(self.check_is_chunked_or_chunk)
 
     async def goodbye(self) -> None:
-        """Shutdown the bot."""
+        """Shutdown the bot.
+
+        In cluster mode, the launcher is asked to stop every cluster instead.
+        """
+        if await self.services.cluster.request_stop():
+            return
         await self.close()
 
+    def reader(self, *, fresh: bool = False) -> "prisma.Prisma":
+        """Return the client to use for read-only queries.
+
+        Reads go to the replica if there is one, unless they must see the latest writes: when
+        ``fresh`` is set, when the current command or event wrote to the database, or when any
+        write was made less than ``replica_max_lag`` seconds ago.
+
+        Parameters
+        ----------
+        fresh: bool
+            Whether the read must see every write made so far. Defaults to ``False``.
+        """
+        if self.replica is None or fresh:
+            return self.database
+        scope = get_query_scope()
+        if scope and scope.wrote:
+            return self.database
+        last_write = getattr(self.database, "last_write", 0.0)
+        if time.monotonic() - last_write < self.settings.replica_max_lag:
+            return self.database
+        return self.replica
+
+    async def invoke(self, ctx: commands.Context["Vindex"], /) -> None:
+        start = time.perf_counter()
+        name = ctx.command.qualified_name if ctx.command else ctx.invoked_with
+        try:
+            with query_scope(f"command {name}"):
+                await super().invoke(ctx)
+        finally:
+            if ctx.command:
+                self.services.metrics.observe_command(
+                    ctx.command.qualified_name, ctx.command_failed, time.perf_counter() - start
+                )
+
+    async def _run_event(
+        self,
+        coro: collections.abc.Callable[
+            ..., collections.abc.Coroutine[typing.Any, typing.Any, typing.Any]
+        ],
+        event_name: str,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> None:
+        with query_scope(f"event {event_name}"):
+            await super()._run_event(coro, event_name, *args, **kwargs)
+
     @property
     def owner_name(self) -> str | None:
         """Attempt to return the name of the owner of the instance.
@@ -156,6 +247,7 @@ class Vindex(commands.AutoShardedBot):
         """
         record = await self.database.botmod.create({"dId": str(user.id)})
         self.bot_mods.append(user.id)
+        await self.services.cluster.dispatch("bot_mod_update", {"id": user.id, "added": True})
         return record
 
     async def remove_bot_mod(self, user: discord.abc.User, /) -> prisma.models.BotMod | None:
@@ -173,8 +265,15 @@ class Vindex(commands.AutoShardedBot):
         """
         record = await self.database.botmod.delete(where={"dId": str(user.id)})
         self.bot_mods.remove(user.id)
+        await self.services.cluster.dispatch("bot_mod_update", {"id": user.id, "added": False})
         return record
 
+    def _on_bot_mod_update(self, data: dict[str, typing.Any]) -> None:
+        if data["added"] and data["id"] not in self.bot_mods:
+            self.bot_mods.append(data["id"])
+        elif not data["added"] and data["id"] in self.bot_mods:
+            self.bot_mods.remove(data["id"])
+
     async def is_bot_mod(self, user: discord.abc.User, /) -> bool:
         """Check if a user is a bot moderator.
 
@@ -209,6 +308,8 @@ class Vindex(commands.AutoShardedBot):
         """Send a message to the core notification channel.
         This should be used to send messages that the owner must be aware of. For example, join of
         a new guild (Since bot works on an authorization system).
+        Notifications queued while another one is being sent are packed together in a single
+        message.
 
         Parameters
         ----------
@@ -218,17 +319,10 @@ class Vindex(commands.AutoShardedBot):
         Returns
         -------
         discord.Message or None
-            The message sent. None if no channel were set.
+            The message sent, possibly shared with other notifications. None if no channel were
+            set.
         """
-        core = await self.database.core.find_unique_or_raise({"id": 1})
-        channel = self.get_channel(core.notifyChannel) if core.notifyChannel else None
-        if not channel:
-            _log.error(
-                "An attempt was made to send a core notification, but no channel was set. Ignoring."
-            )
-            return None
-        assert isinstance(channel, discord.TextChannel)
-        return await channel.send(**kwargs)
+        return await self.services.notifier.notify(**kwargs)
 
     @typing.overload
     async def get_or_fetch_user(
@@ -246,7 +340,8 @@ class Vindex(commands.AutoShardedBot):
         self, user_id: int, /, *, as_none: bool = False
     ) -> discord.User | None:
         """Attempt to get an user from the bot's memory. In case it fails, attempt to fetch it
-        instead.
+        instead. Concurrent fetches of the same user are merged, and results are cached for a
+        while.
 
         Parameters
         ----------
@@ -266,19 +361,18 @@ class Vindex(commands.AutoShardedBot):
         discord.User
             The user fetched or None if it failed.
         """
-        user = self.get_user(user_id)
-        if not user:
-            try:
-                user = await self.fetch_user(user_id)
-            except discord.NotFound:
-                if as_none:
-                    return None
-                raise
-        return user
+        try:
+            return await self.services.users.fetch_user(user_id)
+        except discord.NotFound:
+            if as_none:
+                return None
+            raise
 
     async def get_or_fetch_member(self, guild: discord.Guild, user_id: int, /) -> discord.Member:
         """Attempt to get a member from the bot's memory. In case it fails, attempt to fetch it
-        instead.
+        instead. Concurrent fetches of the same member are merged, and results are cached for a
+        while. Members of the same guild fetched at the same time are requested together through
+        the gateway.
 
         Parameters
         ----------
@@ -297,26 +391,19 @@ class Vindex(commands.AutoShardedBot):
         discord.Member
             The member fetched or None if it failed.
         """
-        member = guild.get_member(user_id)
-        if not member:
-            member = await guild.fetch_member(user_id)
-        return member
+        return await self.services.users.fetch_member(guild, user_id)
 
     async def setup_hook(self) -> None:
         # Database stuff
         _log.info("Connected to database.")
 
-        # Ensuring there is a Core row existing
-        try:
-            await self.database.core.find_unique_or_raise({"id": 1})
-        except prisma.errors.RecordNotFoundError:
-            await self.database.core.create({"id": 1})
         self.bot_mods = [
             int(botmod.dId)
-            for botmod in await self.database.botmod.find_many(
+            for botmod in await self.reader().botmod.find_many(
                 where={"power": True}, include={"user": True}
             )
         ]
+        self.services.cluster.add_listener("bot_mod_update", self._on_bot_mod_update)
 
         # Core cogs (Most-load cogs)
         modules = pkgutil.iter_modules(
@@ -344,7 +431,11 @@ class Vindex(commands.AutoShardedBot):
     async def get_context(
         self, origin: discord.Message | discord.Interaction, /, *, cls: type = Context
     ) -> Context:
-        return await super().get_context(origin, cls=cls)  # pyright: ignore[reportArgumentType]
+        ctx = await super().get_context(origin, cls=cls)  # pyright: ignore[reportArgumentType]
+        # Only messages targeting the bot need a language, most messages never get this far.
+        if ctx.prefix is not None:
+            set_language_from_guild(self, ctx.guild.id if ctx.guild else None)
+        return ctx
 
     async def on_command_error(  # pyright: ignore[reportIncompatibleMethodOverride]
         # Weirdest issue I ever had
@@ -443,10 +534,6 @@ class Vindex(commands.AutoShardedBot):
             activity=discord.CustomActivity(_("Flying the F-14B Tomcat")),
         )
 
-    async def on_message(self, message: discord.Message, /) -> None:
-        await set_language_from_guild(self, message.guild.id if message.guild else None)
-        return await super().on_message(message)
-
     # A few global checks
 
     @staticmethod
@@ -455,8 +542,7 @@ class Vindex(commands.AutoShardedBot):
 
     @staticmethod
     async def check_is_chunked_or_chunk(ctx: Context):
-        if not ctx.guild:
-            return True
-        if not ctx.guild.chunked:
-            await ctx.guild.chunk()
+        # Never wait for the chunk here, the guild is chunked in the background.
+        if ctx.guild and not ctx.guild.chunked:
+            ctx.bot.services.chunking.request(ctx.guild, priority=True)
         return True
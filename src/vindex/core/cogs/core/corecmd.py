@@ -63,9 +63,7 @@ class Core(commands.Cog):
     async def cmd_invite(self, ctx: "Context"):
         """Return an invitation code where to invite the bot."""
         assert self.bot.user
-        invite_permissions_code = (
-            await ctx.db.core.find_unique_or_raise({"id": 1})
-        ).invitePermissionCode
+        invite_permissions_code = self.bot.services.core_settings.invite_permission_code
         invite_permissions = discord.Permissions(invite_permissions_code or 40544595463233)
         invite_url = discord.utils.oauth_url(
             self.bot.user.id,
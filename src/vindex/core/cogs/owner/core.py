@@ -47,21 +47,72 @@ class Owner(commands.Cog):
     ):
         """Set the channel where the bot will send import notification to."""
         if channel is None:
-            core = await ctx.db.core.find_unique_or_raise(where={"id": 1})
-            if core.notifyChannel is None:
+            notify_channel = self.bot.services.core_settings.notify_channel
+            if notify_channel is None:
                 await ctx.send(_("No notification channel have been set yet."))
                 return
 
-            set_channel = self.bot.get_channel(core.notifyChannel)
-            assert isinstance(set_channel, discord.TextChannel)
+            # The channel may belong to a guild held by another cluster.
             await ctx.send(
-                _("The current channel is {channel}.").format(channel=set_channel.mention)
+                _("The current channel is {channel}.").format(channel=f"<#{notify_channel}>")
             )
             return
 
-        await ctx.db.core.update(where={"id": 1}, data={"notifyChannel": channel.id})
+        await self.bot.services.core_settings.update({"notifyChannel": channel.id})
         await ctx.send(_("The channel has been set to {channel}.").format(channel=channel.mention))
 
+    @cmd_owner.command(name="services")
+    async def cmd_owner_services(self, ctx: "Context"):
+        """Show how long each service took to set up."""
+        timings = self.bot.services.setup_timings
+        services = self.bot.services.all
+
+        embed = discord.Embed(title=_("Services setup"), color=ctx.color)
+        lines: list[str] = []
+        for name, service in services.items():
+            timing = timings.get(name)
+            line = _("{name}: {timing}").format(
+                name=inline(name),
+                timing=f"{timing * 1000:.1f}ms" if timing is not None else _("not set up"),
+            )
+            if service.dependencies:
+                line += _(" (after {dependencies})").format(
+                    dependencies=", ".join(service.dependencies)
+                )
+            lines.append(line)
+        embed.description = "\n".join(lines)
+
+        await ctx.send(embed=embed)
+
+    @cmd_owner.command(name="clusters")
+    async def cmd_owner_clusters(self, ctx: "Context"):
+        """Show the shards and guilds of each cluster."""
+        infos = await self.bot.services.cluster.query("info")
+
+        embed = discord.Embed(title=_("Clusters"), color=ctx.color)
+        lines: list[str] = []
+        for cluster_id, info in sorted(infos.items()):
+            if info is None:
+                lines.append(_("{id}: no answer").format(id=inline(str(cluster_id))))
+                continue
+            lines.append(
+                _("{id}: shards {first} to {last}, {guilds} guilds, {latency}ms").format(
+                    id=inline(str(cluster_id)),
+                    first=min(info["shards"]),
+                    last=max(info["shards"]),
+                    guilds=info["guilds"],
+                    latency=round(info["latency"] * 1000),
+                )
+            )
+        embed.description = "\n".join(lines)
+        embed.set_footer(
+            text=_("{guilds} guilds in total").format(
+                guilds=sum(info["guilds"] for info in infos.values() if info)
+            )
+        )
+
+        await ctx.send(embed=embed)
+
     @cmd_owner.command(name="sync")
     async def cmd_owner_sync(self, ctx: "Context", guild: discord.Guild | None = None):
         """Sync the command tree for a guild or globally."""
@@ -59,12 +59,26 @@ class Context(commands.Context["Vindex"]):
         """Return the color used for embeds."""
         return BOT_COLOR
 
+    async def send(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, content: str | None = None, **kwargs: typing.Any
+    ) -> discord.Message:
+        """Send a message to the context's channel.
+
+        Replies to interactions are sent by discord.py. Other messages go through the outbox,
+        without being merged, as the caller may edit them.
+        """
+        if self.interaction is not None:
+            return await super().send(content, **kwargs)
+        # Only interaction responses can be ephemeral.
+        kwargs.pop("ephemeral", None)
+        return await self.bot.services.outbox.send(self, content, merge=False, **kwargs)
+
     async def send_pm_or_report(
         self, **kwargs: typing.Unpack[SendMethodDict]
     ) -> discord.Message | None:
         """Send a message to the author's DM."""
         try:
-            await self.author.send(**kwargs)
+            return await self.bot.services.outbox.send(self.author, **kwargs)
         except discord.Forbidden:
             await self.send(
                 _(
@@ -73,6 +87,7 @@ class Context(commands.Context["Vindex"]):
                     "or in this server."
                 )
             )
+            return None
 
     async def tick(self, *, to_message: discord.Message | None = None) -> bool:
         """Add a tick reaction to the message.
@@ -1,10 +1,19 @@
+import datetime
 import enum
+import functools
+import hashlib
 import logging
+import marshal
+import os
 import pathlib
 import typing
 from contextvars import ContextVar
 
 import babel.core
+import babel.dates
+import babel.lists
+import babel.numbers
+import platformdirs
 import polib
 from discord.ext import commands
 
@@ -15,6 +24,8 @@ if typing.TYPE_CHECKING:
 
 _log = logging.getLogger(__name__)
 _current_language = ContextVar("current_language", default="en")
+_catalogs: dict[pathlib.Path, dict[str, str]] = {}
+"""Catalogs already loaded in this process, keyed by the path of their ".po" file."""
 
 
 class Languages(enum.Enum):
@@ -47,17 +58,47 @@ class Languages(enum.Enum):
             ) from exception
 
 
+def get_current_language() -> str:
+    """Return the code of the current language used by the bot."""
+    return _current_language.get()
+
+
+@functools.cache
+def get_babel_locale(language: str) -> babel.core.Locale:
+    """Return the Babel locale of a language. Locales are created once per process."""
+    return babel.core.Locale.parse(language)
+
+
 def get_babel_current_language() -> babel.core.Locale:
     """Return the current language used by the bot."""
-    return babel.core.Locale(_current_language.get())
+    return get_babel_locale(_current_language.get())
 
 
-async def set_language_from_guild(bot: "Vindex", guild_id: int | None = None) -> None:
-    """Set the language to use from a guild."""
+def warm_babel_locales() -> None:
+    """Load the Babel locale of every language, and resolve the patterns used by
+    :py:class:`vindex.core.utils.formatting.Humanize`.
+
+    Loading a locale's data reads it from the disk, this is blocking and should be ran in a
+    thread.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for language in Languages:
+        locale = get_babel_locale(language.value)
+        babel.lists.format_list(["", ""], locale=locale)
+        babel.numbers.format_decimal(0, locale=locale)
+        for date_format in ("full", "long", "medium", "short"):
+            babel.dates.format_datetime(now, date_format, locale=locale)
+        babel.dates.format_timedelta(datetime.timedelta(), locale=locale)
+
+
+def set_language_from_guild(bot: "Vindex", guild_id: int | None = None) -> None:
+    """Set the language to use from a guild.
+
+    This only reads the in-memory cache of the i18n service and never awaits.
+    """
     language = (
-        await bot.services.i18n.get_guild_locale(guild_id) if guild_id else Languages.ENGLISH
+        bot.services.i18n.get_cached_guild_locale(guild_id) if guild_id else Languages.ENGLISH
     )
-    _log.debug("Setting language to %s", language)
     _current_language.set(language.value)
 
 
@@ -77,8 +118,84 @@ def get_path_to_locales(path: pathlib.Path) -> pathlib.Path:
     return (path / "locales").resolve()
 
 
+def get_path_to_compiled_catalogs() -> pathlib.Path:
+    """Return the path to the folder where compiled catalogs are cached.
+
+    Returns
+    -------
+    pathlib.Path
+        The path to the compiled catalogs folder.
+    """
+    return platformdirs.user_cache_path("vindex", ensure_exists=True) / "locales"
+
+
+def _compiled_catalog_path(po_path: pathlib.Path) -> pathlib.Path:
+    stat = po_path.stat()
+    key = f"{po_path}:{stat.st_mtime_ns}:{stat.st_size}:{marshal.version}"
+    digest = hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+    return get_path_to_compiled_catalogs() / f"{po_path.stem}-{digest}.marshal"
+
+
+def compile_catalog(po_path: pathlib.Path) -> dict[str, str]:
+    """Parse a ".po" file and cache its compiled catalog for the next loads.
+
+    Parameters
+    ----------
+    po_path : pathlib.Path
+        The path to the ".po" file to compile.
+
+    Returns
+    -------
+    dict[str, str]
+        The translated entries of the file, as ``{msgid: msgstr}``.
+    """
+    catalog = {entry.msgid: entry.msgstr for entry in polib.pofile(str(po_path)) if entry.msgstr}
+
+    compiled_path = _compiled_catalog_path(po_path)
+    try:
+        compiled_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = compiled_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_bytes(marshal.dumps(catalog))
+        os.replace(temporary_path, compiled_path)
+    except OSError:
+        _log.warning("Unable to cache the compiled catalog of %s.", po_path, exc_info=True)
+    return catalog
+
+
+def load_catalog(po_path: pathlib.Path) -> dict[str, str]:
+    """Load the catalog of a ".po" file.
+
+    Catalogs are shared by the whole process. The compiled catalog is used if it is up to date
+    with the ".po" file, otherwise the ".po" file is parsed and compiled again.
+
+    Parameters
+    ----------
+    po_path : pathlib.Path
+        The path to the ".po" file to load.
+
+    Returns
+    -------
+    dict[str, str]
+        The translated entries of the file, as ``{msgid: msgstr}``.
+    """
+    if (catalog := _catalogs.get(po_path)) is not None:
+        return catalog
+
+    try:
+        catalog = marshal.loads(_compiled_catalog_path(po_path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        _log.debug("Compiling catalog %s", po_path)
+        catalog = compile_catalog(po_path)
+
+    _catalogs[po_path] = catalog
+    return catalog
+
+
 class Translator:
-    """Utility class used to translate strings."""
+    """Utility class used to translate strings.
+
+    Locales are loaded on their first use, from their compiled catalog when possible.
+    """
 
     module_name: str
     """The name of the module."""
@@ -87,28 +204,50 @@ class Translator:
     """Location of the module's files. Supposedly, ``__file__``."""
 
     translations: dict[str, dict[str, str]]
-    """Dictionnary containing the translations of the module."""
+    """Dictionnary containing the translations of the module that have been loaded so far."""
 
     def __init__(self, module_name: str, file_location: "StrPathOrPath") -> None:
         self.module_name = module_name
         self.module_location = pathlib.Path(file_location).parent.resolve()
         self.translations = {}
 
-        self.load_translations()
+        if not get_path_to_locales(self.module_location).exists():
+            _log.warning("No locales folder found for %s", self.module_name)
 
     def __call__(self, message: str) -> str:
         # FIXME: Docstrings are not translated!
+        language = _current_language.get()
         try:
-            trsnl = self.translations[_current_language.get()][message]
-            return trsnl
+            catalog = self.translations[language]
         except KeyError:
-            return message
+            catalog = self.load_locale(language)
+        return catalog.get(message, message)
+
+    def load_locale(self, locale: str) -> dict[str, str]:
+        """Load the translations of a single locale.
+
+        Parameters
+        ----------
+        locale : str
+            The locale to load, as the name of its ".po" file.
+
+        Returns
+        -------
+        dict[str, str]
+            The translations of the locale. Empty if the module has no such locale.
+        """
+        locale_file = get_path_to_locales(self.module_location) / f"{locale}.po"
+        if locale_file.exists():
+            catalog = load_catalog(locale_file)
+        else:
+            catalog = {}
+        self.translations[locale] = catalog
+        return catalog
 
     def load_translations(self):
-        """Load the translations from a module."""
+        """Load the translations of every locale of a module."""
         locales_path = get_path_to_locales(self.module_location)
         if not locales_path.exists():
-            _log.warning("No locales folder found for %s", self.module_name)
             return
 
         for locale_file in locales_path.iterdir():
@@ -119,13 +258,4 @@ class Translator:
                         str(locale_file),
                     )
                 continue
-
-            locale = locale_file.stem
-            path = str(locale_file.resolve())
-            _log.debug("Loading locale %s from %s", locale, path)
-            po_class = polib.pofile(path)
-
-            for entry in po_class:
-                if entry.msgstr:
-                    _log.log(0, "%s=%s", entry.msgid, entry.msgstr)
-                    self.translations.setdefault(locale, {})[entry.msgid] = entry.msgstr
+            self.load_locale(locale_file.stem)
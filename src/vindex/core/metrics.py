@@ -0,0 +1,206 @@
+"""Minimal metrics, rendered in the Prometheus text exposition format (version 0.0.4)."""
+
+import bisect
+import collections.abc
+import math
+import typing
+
+type LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Default histogram buckets, in seconds."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """Base class of metrics.
+
+    Label values are given positionally, in the order of the metric's label names.
+    """
+
+    kind: typing.ClassVar[str]
+
+    name: str
+    """The name of the metric."""
+
+    documentation: str
+    """The help text of the metric."""
+
+    label_names: tuple[str, ...]
+    """The names of the metric's labels."""
+
+    def __init__(
+        self, name: str, documentation: str, label_names: collections.abc.Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _check(self, label_values: LabelValues) -> LabelValues:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(
+                f"{self.name} expects {len(self.label_names)} label values, "
+                f"got {len(label_values)}."
+            )
+        return tuple(map(str, label_values))
+
+    def _labels(self, label_values: LabelValues, **extra: str) -> str:
+        pairs = [*zip(self.label_names, label_values), *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> collections.abc.Iterator[str]:
+        """Yield the lines of each sample of the metric."""
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        """Render the metric, with its help and type lines."""
+        return "\n".join(
+            (
+                f"# HELP {self.name} {_escape(self.documentation)}",
+                f"# TYPE {self.name} {self.kind}",
+                *self.samples(),
+            )
+        )
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    _values: dict[LabelValues, float]
+
+    def __init__(
+        self, name: str, documentation: str, label_names: collections.abc.Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the counter of the given labels."""
+        key = self._check(label_values)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the counter of the given labels, for counters kept elsewhere."""
+        self._values[self._check(label_values)] = value
+
+    def samples(self) -> collections.abc.Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    _values: dict[LabelValues, float]
+
+    def __init__(
+        self, name: str, documentation: str, label_names: collections.abc.Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the value of the given labels."""
+        self._values[self._check(label_values)] = value
+
+    def clear(self) -> None:
+        """Remove every value, so labels that no longer exist are not rendered."""
+        self._values.clear()
+
+    def samples(self) -> collections.abc.Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Observations counted in buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    buckets: tuple[float, ...]
+    """The upper bounds of the buckets, in ascending order. Excludes +Inf."""
+
+    _values: dict[LabelValues, tuple[list[int], list[float]]]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: collections.abc.Sequence[str] = (),
+        *,
+        buckets: collections.abc.Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observation for the given labels."""
+        key = self._check(label_values)
+        entry = self._values.get(key)
+        if entry is None:
+            # One bucket more for +Inf, and the sum.
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> collections.abc.Iterator[str]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = self._labels(key, le=_format_value(float(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total[0])}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class Registry:
+    """A collection of metrics, rendered together.
+
+    Collectors are called before each render, to update the metrics computed on demand.
+    """
+
+    _metrics: dict[str, Metric]
+    _collectors: list[collections.abc.Callable[[], None]]
+
+    def __init__(self) -> None:
+        self._metrics = {}
+        self._collectors = []
+
+    def register[M: Metric](self, metric: M) -> M:
+        """Register a metric, and return it."""
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric named {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: collections.abc.Callable[[], None]) -> None:
+        """Add a function called before each render."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric."""
+        for collector in self._collectors:
+            collector()
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
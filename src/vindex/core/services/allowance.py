@@ -0,0 +1,292 @@
+import collections.abc
+import itertools
+import logging
+import typing
+
+from prisma.models import GuildAllowance, User
+from vindex.core.services.proto import Service
+from vindex.core.utils.batching import ModelLoader
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+QUERY_CHUNK_SIZE = 1000
+"""The maximum number of IDs sent in a single ``IN`` query."""
+
+WRITE_BATCH_SIZE = 500
+"""The maximum number of rows written in a single query or transaction."""
+
+type ProgressCallback = collections.abc.Callable[[int, int], collections.abc.Awaitable[None]]
+
+
+class GuildAllowanceService(Service):
+    """Service keeping track of which guilds are allowed to use the bot.
+
+    Every allowance record is indexed in memory on setup, and kept in sync on each change made
+    through the service, in every cluster. Checks never query the database.
+    """
+
+    dependencies = ("cluster",)
+
+    _allowances: dict[int, bool]
+    _loader: ModelLoader[GuildAllowance]
+
+    def __init__(self, bot: "Vindex") -> None:
+        self.bot = bot
+        self._allowances = {}
+        self._loader = ModelLoader(
+            GuildAllowance,
+            include={"createdBy": True},
+            client=bot.reader,
+            max_batch_size=QUERY_CHUNK_SIZE,
+        )
+
+    def __len__(self) -> int:
+        return len(self._allowances)
+
+    def is_allowed(self, guild_id: int, /) -> bool:
+        """Indicates if the guild is allowed to use the bot or not.
+
+        This will also return `False` if the guild has no record.
+        """
+        return self._allowances.get(guild_id, False)
+
+    def is_known(self, guild_id: int, /) -> bool:
+        """Indicates if the guild has an allowance record."""
+        return guild_id in self._allowances
+
+    async def get(self, guild_id: int, /) -> GuildAllowance | None:
+        """Get the allowance record of a guild, including its author.
+
+        Records read at the same time are read with a single query.
+        """
+        return await self._loader.load(guild_id)
+
+    async def refresh(self, guild_ids: collections.abc.Iterable[int], /) -> None:
+        """Reload the allowance of the given guilds from the database.
+
+        Guilds are fetched with as few ``IN`` queries as possible. Guilds without a record are
+        removed from the index.
+
+        Parameters
+        ----------
+        guild_ids : Iterable of int
+            The IDs of the guilds to reload.
+        """
+        for batch in itertools.batched(guild_ids, QUERY_CHUNK_SIZE):
+            records = await GuildAllowance.prisma(self.bot.reader()).find_many(
+                where={"id": {"in": [str(guild_id) for guild_id in batch]}}
+            )
+            found = {int(record.id): record.allowed for record in records}
+            self._apply({guild_id: found.get(guild_id) for guild_id in batch})
+
+    async def allow(self, guild_id: int, reason: str, *, author_id: int) -> GuildAllowance:
+        """Allow a guild to use the bot.
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild to allow.
+        reason : str
+            The reason for allowing the guild.
+        author_id : int
+            The ID of the user allowing the guild.
+
+        Returns
+        -------
+        prisma.models.GuildAllowance
+            The allowance record.
+        """
+        return await self._upsert(guild_id, True, reason, author_id)
+
+    async def disallow(
+        self, guild_id: int, reason: str, *, author_id: int | None = None
+    ) -> GuildAllowance | None:
+        """Disallow a guild to use the bot.
+
+        Parameters
+        ----------
+        guild_id : int
+            The ID of the guild to disallow.
+        reason : str
+            The reason for disallowing the guild.
+        author_id : int or None
+            The ID of the user disallowing the guild. If none, the existing record is updated
+            and its author kept, and nothing is done if the guild has no record.
+
+        Returns
+        -------
+        prisma.models.GuildAllowance or None
+            The allowance record. None if the guild had no record and no author were given.
+        """
+        if author_id is not None:
+            return await self._upsert(guild_id, False, reason, author_id)
+
+        if not self.is_known(guild_id):
+            return None
+        record = await GuildAllowance.prisma().update(
+            where={"id": str(guild_id)}, data={"allowed": False, "allowanceReason": reason}
+        )
+        if record:
+            await self._publish({guild_id: False})
+        return record
+
+    async def bulk_set(
+        self,
+        reasons: collections.abc.Mapping[int, str],
+        /,
+        *,
+        allowed: bool,
+        author_id: int,
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """Allow or disallow many guilds at once.
+
+        Existing records are read once, missing records are created in bulk and existing
+        records are updated in batched transactions.
+
+        Parameters
+        ----------
+        reasons : Mapping of int to str
+            The IDs of the guilds to change, mapped to the reason of the change.
+        allowed : bool
+            Whether to allow or disallow the guilds.
+        author_id : int
+            The ID of the user changing the allowance.
+        on_progress : Callable, optional
+            A coroutine function called with the number of written guilds and the total number
+            of guilds after each write.
+
+        Returns
+        -------
+        int
+            The number of guilds changed.
+        """
+        total = len(reasons)
+        if not total:
+            return 0
+
+        await self.ensure_author(author_id)
+
+        existing: set[int] = set()
+        for batch in itertools.batched(reasons, QUERY_CHUNK_SIZE):
+            records = await GuildAllowance.prisma().find_many(
+                where={"id": {"in": [str(guild_id) for guild_id in batch]}}
+            )
+            existing.update(int(record.id) for record in records)
+        new = [guild_id for guild_id in reasons if guild_id not in existing]
+
+        done = 0
+        for batch in itertools.batched(new, WRITE_BATCH_SIZE):
+            await GuildAllowance.prisma().create_many(
+                data=[
+                    {
+                        "id": str(guild_id),
+                        "allowed": allowed,
+                        "allowanceReason": reasons[guild_id],
+                        "createdById": str(author_id),
+                    }
+                    for guild_id in batch
+                ],
+                skip_duplicates=True,
+            )
+            await self._publish(dict.fromkeys(batch, allowed))
+            done += len(batch)
+            if on_progress:
+                await on_progress(done, total)
+
+        for batch in itertools.batched(existing, WRITE_BATCH_SIZE):
+            async with self.bot.database.batch_() as batcher:
+                for guild_id in batch:
+                    batcher.guildallowance.update(
+                        where={"id": str(guild_id)},
+                        data={
+                            "allowed": allowed,
+                            "allowanceReason": reasons[guild_id],
+                            "createdBy": {"connect": {"id": str(author_id)}},
+                        },
+                    )
+            await self._publish(dict.fromkeys(batch, allowed))
+            done += len(batch)
+            if on_progress:
+                await on_progress(done, total)
+
+        return done
+
+    async def ensure_author(self, author_id: int, /) -> None:
+        """Create the user record of an allowance's author, if it does not exist yet."""
+        await User.prisma().upsert(
+            where={"id": str(author_id)},
+            data={"create": {"id": str(author_id)}, "update": {}},
+        )
+
+    async def forget(self, guild_id: int, /) -> GuildAllowance | None:
+        """Delete the allowance record of a guild.
+
+        Returns
+        -------
+        prisma.models.GuildAllowance or None
+            The deleted record. None if the guild had no record.
+        """
+        record = await GuildAllowance.prisma().delete(where={"id": str(guild_id)})
+        await self._publish({guild_id: None})
+        return record
+
+    async def _upsert(
+        self, guild_id: int, allowed: bool, reason: str, author_id: int
+    ) -> GuildAllowance:
+        created_by: typing.Any = {
+            "connect": {"id": str(author_id)},
+            "create": {"id": str(author_id)},
+        }
+        record = await GuildAllowance.prisma().upsert(
+            where={"id": str(guild_id)},
+            data={
+                "create": {
+                    "id": str(guild_id),
+                    "allowed": allowed,
+                    "allowanceReason": reason,
+                    "createdBy": created_by,
+                },
+                "update": {
+                    "allowed": allowed,
+                    "allowanceReason": reason,
+                    "createdBy": created_by,
+                },
+            },
+        )
+        await self._publish({guild_id: record.allowed})
+        return record
+
+    def _apply(self, changes: collections.abc.Mapping[int, bool | None]) -> None:
+        for guild_id, allowed in changes.items():
+            if allowed is None:
+                self._allowances.pop(guild_id, None)
+            else:
+                self._allowances[guild_id] = allowed
+
+    async def _publish(self, changes: collections.abc.Mapping[int, bool | None]) -> None:
+        """Apply changes to the index, and send them to the other clusters.
+
+        None removes a guild from the index.
+        """
+        self._apply(changes)
+        await self.bot.services.cluster.dispatch(
+            "allowance_update", [[guild_id, allowed] for guild_id, allowed in changes.items()]
+        )
+
+    def _on_update(self, changes: list[tuple[int, bool | None]]) -> None:
+        self._apply(dict(changes))
+
+    async def setup(self) -> None:
+        """Setup the allowance service, indexing every allowance record.
+
+        Changes made by the other clusters are applied as they are received.
+        """
+        self.bot.services.cluster.add_listener("allowance_update", self._on_update)
+        records = await GuildAllowance.prisma(self.bot.reader()).find_many()
+        self._allowances = {int(record.id): record.allowed for record in records}
+        _log.debug("Indexed %s guild allowances.", len(self._allowances))
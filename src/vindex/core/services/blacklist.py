@@ -1,21 +1,75 @@
+import asyncio
+import contextlib
+import logging
 import typing
+import urllib.parse
+import uuid
 
 import discord
 
 from prisma.models import Blacklist
 from vindex.core.services.proto import Service
 
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
 if typing.TYPE_CHECKING:
     from vindex.core.bot import Vindex
 
 
+_log = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "vindex_blacklist"
+"""The Postgres channel blacklist changes are notified on."""
+
+DSN_PARAMETERS = frozenset(
+    {
+        "host",
+        "port",
+        "dbname",
+        "user",
+        "password",
+        "passfile",
+        "sslmode",
+        "sslcert",
+        "sslkey",
+        "sslrootcert",
+        "sslcrl",
+        "sslpassword",
+        "ssl_min_protocol_version",
+        "ssl_max_protocol_version",
+        "target_session_attrs",
+        "application_name",
+    }
+)
+"""The libpq parameters of the database URL given to asyncpg.
+
+Others, like Prisma's ``schema`` or ``connection_limit``, are unknown to Postgres.
+"""
+
+
 class BlacklistService(Service):
-    """Services used to manage blacklisted users."""
+    """Services used to manage blacklisted users.
+
+    Changes are notified on a Postgres channel, so that every instance sharing the database
+    applies them. Listening requires the optional ``asyncpg`` package.
+    """
+
+    blacklisted_ids: set[int]
+    """The IDs of the blacklisted users. Replaced as a whole when reloaded."""
 
-    blacklisted_ids: list[int]
+    _instance_id: str
+    _listener: "asyncpg.Connection | None"
+    _listen_task: asyncio.Task[None] | None
 
     def __init__(self, bot: "Vindex") -> None:
         self.bot = bot
+        self.blacklisted_ids = set()
+        self._instance_id = uuid.uuid4().hex
+        self._listener = None
+        self._listen_task = None
         super().__init__()
 
     async def add_to_blacklist(
@@ -47,7 +101,8 @@ class BlacklistService(Service):
                 "createdById": str(author.id),
             }
         )
-        self.blacklisted_ids.append(user_id)
+        self.blacklisted_ids.add(user_id)
+        await self._notify("add", user_id)
 
         return case
 
@@ -68,7 +123,8 @@ class BlacklistService(Service):
             return None
 
         case = await Blacklist.prisma().delete(where={"blacklistedId": str(user_id)})
-        self.blacklisted_ids.remove(user_id)
+        self.blacklisted_ids.discard(user_id)
+        await self._notify("remove", user_id)
 
         return case
 
@@ -108,8 +164,87 @@ class BlacklistService(Service):
         """
         return user_id in self.blacklisted_ids
 
+    async def _notify(self, action: typing.Literal["add", "remove"], user_id: int) -> None:
+        await self.bot.database.execute_raw(
+            "SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, f"{self._instance_id}:{action}:{user_id}"
+        )
+
+    def _on_notification(self, _: "asyncpg.Connection", __: int, ___: str, payload: str) -> None:
+        instance_id, action, user_id = payload.split(":")
+        if instance_id == self._instance_id:
+            return
+        if action == "add":
+            self.blacklisted_ids.add(int(user_id))
+        elif action == "remove":
+            self.blacklisted_ids.discard(int(user_id))
+        _log.debug("Applied blacklist change from another instance: %s %s", action, user_id)
+
+    async def _listen(self) -> None:
+        assert asyncpg
+        url = urllib.parse.urlsplit(self.bot.settings.database_url)
+        query = [
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(url.query)
+            if key in DSN_PARAMETERS
+        ]
+        dsn = url._replace(query=urllib.parse.urlencode(query)).geturl()
+
+        delay = 1
+        reconnecting = False
+        while True:
+            try:
+                self._listener = await asyncpg.connect(dsn)
+                await self._listener.add_listener(NOTIFY_CHANNEL, self._on_notification)
+                if reconnecting:
+                    # Changes may have been missed while not listening.
+                    await self._load(fresh=True)
+                reconnecting = True
+                delay = 1
+                closed = asyncio.get_running_loop().create_future()
+                self._listener.add_termination_listener(
+                    lambda _, closed=closed: closed.done() or closed.set_result(None)
+                )
+                await closed
+                _log.warning("Lost the blacklist notifications connection. Reconnecting...")
+            except Exception:  # pylint: disable=broad-exception-caught
+                _log.warning(
+                    "Unable to listen to blacklist notifications. Retrying in %s seconds.",
+                    delay,
+                    exc_info=True,
+                )
+            if self._listener and not self._listener.is_closed():
+                self._listener.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    async def _load(self, *, fresh: bool = False) -> None:
+        cases = await Blacklist.prisma(self.bot.reader(fresh=fresh)).find_many()
+        self.blacklisted_ids = {int(case.blacklistedId) for case in cases}
+
+    @staticmethod
+    def _on_listen_done(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and (exception := task.exception()):
+            _log.error("Stopped listening to blacklist notifications.", exc_info=exception)
+
+    async def close(self) -> None:
+        """Stop listening to blacklist notifications, and close the connection."""
+        if self._listen_task:
+            self._listen_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listen_task
+            self._listen_task = None
+        if self._listener and not self._listener.is_closed():
+            await self._listener.close(timeout=5)
+        self._listener = None
+
     async def setup(self) -> None:
         """Prepare the service."""
-        self.blacklisted_ids = [
-            int(case.blacklistedId) for case in await Blacklist.prisma().find_many()
-        ]
+        await self._load()
+        if asyncpg is None:
+            _log.info(
+                "asyncpg is not installed, blacklist changes made by other instances will not be "
+                "seen until restart."
+            )
+            return
+        self._listen_task = asyncio.create_task(self._listen())
+        self._listen_task.add_done_callback(self._on_listen_done)
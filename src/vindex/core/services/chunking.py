@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import itertools
+import logging
+import time
+import typing
+
+import discord
+
+from vindex.core.services.proto import Service
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class ChunkingService(Service):
+    """Service used to chunk guilds in the background.
+
+    Guilds are queued per shard and chunked by a limited number of workers per shard, which
+    wait for the shard's gateway rate limit to clear before sending a chunk request.
+    """
+
+    max_concurrency_per_shard: int
+    """The maximum number of guilds chunked at the same time on a single shard."""
+
+    chunk_timeout: float
+    """The maximum number of seconds to wait for a guild to be chunked."""
+
+    _queues: dict[int, asyncio.PriorityQueue[tuple[int, int, int]]]
+    _pending: dict[int, int]
+    _in_flight: set[int]
+    _waiters: dict[int, asyncio.Future[None]]
+    _workers: set[asyncio.Task[None]]
+    _durations: collections.deque[float]
+    _stopped: bool
+
+    def __init__(
+        self, bot: "Vindex", *, max_concurrency_per_shard: int = 1, chunk_timeout: float = 60.0
+    ) -> None:
+        self.bot = bot
+        self.max_concurrency_per_shard = max_concurrency_per_shard
+        self.chunk_timeout = chunk_timeout
+
+        self._queues = {}
+        self._pending = {}
+        self._in_flight = set()
+        self._waiters = {}
+        self._workers = set()
+        self._durations = collections.deque(maxlen=100)
+        self._counter = itertools.count()
+        self._stopped = False
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of guilds waiting to be chunked."""
+        return len(self._pending)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of guilds currently being chunked."""
+        return len(self._in_flight)
+
+    @property
+    def chunk_durations(self) -> tuple[float, ...]:
+        """The durations, in seconds, of the latest chunks. Oldest first."""
+        return tuple(self._durations)
+
+    def request(self, guild: discord.Guild, /, *, priority: bool = False) -> None:
+        """Queue a guild to be chunked in the background. This never waits.
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild to chunk.
+        priority : bool
+            Whether the guild should be chunked before guilds queued without priority.
+            Commands should use this.
+        """
+        if self._stopped:
+            return
+        self._enqueue(guild, priority)
+
+    async def wait_chunked(self, guild: discord.Guild, /, *, priority: bool = False) -> None:
+        """Queue a guild to be chunked and wait until it is.
+
+        This should not be used in commands, which should never wait for a full chunk.
+        Once the service is stopped, this returns right away.
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild to chunk.
+        priority : bool
+            Whether the guild should be chunked before guilds queued without priority.
+
+        Raises
+        ------
+        asyncio.CancelledError
+            The service was stopped before the guild was chunked.
+        """
+        if self._stopped:
+            return
+        waiter = self._enqueue(guild, priority)
+        if waiter is not None:
+            await asyncio.shield(waiter)
+
+    def _enqueue(self, guild: discord.Guild, priority: bool) -> asyncio.Future[None] | None:
+        if guild.chunked:
+            return None
+
+        level = PRIORITY_HIGH if priority else PRIORITY_NORMAL
+        waiter = self._waiters.get(guild.id)
+        if waiter is None:
+            waiter = self._waiters[guild.id] = asyncio.get_running_loop().create_future()
+
+        if guild.id in self._in_flight:
+            return waiter
+        if guild.id in self._pending and self._pending[guild.id] <= level:
+            return waiter
+
+        # An upgraded guild is queued again; its older entry is skipped by the workers.
+        self._pending[guild.id] = level
+        self._get_queue(guild.shard_id).put_nowait((level, next(self._counter), guild.id))
+        return waiter
+
+    def _get_queue(self, shard_id: int) -> asyncio.PriorityQueue[tuple[int, int, int]]:
+        queue = self._queues.get(shard_id)
+        if queue is None:
+            queue = self._queues[shard_id] = asyncio.PriorityQueue()
+            for _ in range(self.max_concurrency_per_shard):
+                task = asyncio.create_task(self._worker(shard_id, queue))
+                self._workers.add(task)
+                task.add_done_callback(self._workers.discard)
+        return queue
+
+    async def _worker(
+        self, shard_id: int, queue: asyncio.PriorityQueue[tuple[int, int, int]]
+    ) -> None:
+        while True:
+            level, _, guild_id = await queue.get()
+            if self._pending.get(guild_id) != level:
+                continue
+            del self._pending[guild_id]
+
+            self._in_flight.add(guild_id)
+            try:
+                await self._wait_for_shard(shard_id)
+                await self._chunk(guild_id)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The worker must keep going, or the shard's queue would never drain again.
+                _log.exception("Unexpected error while chunking guild %s.", guild_id)
+            finally:
+                self._in_flight.discard(guild_id)
+                waiter = self._waiters.pop(guild_id, None)
+                if waiter and not waiter.done():
+                    waiter.set_result(None)
+
+    async def _wait_for_shard(self, shard_id: int) -> None:
+        shard = self.bot.get_shard(shard_id)
+        while shard and shard.is_ws_ratelimited():
+            await asyncio.sleep(1)
+
+    async def _chunk(self, guild_id: int) -> None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is None or guild.chunked:
+            return
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(guild.chunk(), timeout=self.chunk_timeout)
+        except asyncio.TimeoutError:
+            _log.warning("Timed out while chunking guild %s.", guild_id)
+            return
+        except discord.DiscordException:
+            _log.error("Failed to chunk guild %s.", guild_id, exc_info=True)
+            return
+
+        duration = time.perf_counter() - start
+        self._durations.append(duration)
+        _log.debug(
+            "Chunked guild %s (%s members) in %.2fs. %s guilds left in queue.",
+            guild_id,
+            guild.member_count,
+            duration,
+            self.queue_depth,
+        )
+
+    def stop(self) -> None:
+        """Stop every worker. Queued guilds are not chunked, and new requests are ignored.
+
+        Callers waiting for a guild to be chunked are cancelled.
+        """
+        self._stopped = True
+        for task in self._workers:
+            task.cancel()
+        for waiter in self._waiters.values():
+            waiter.cancel()
+        self._waiters.clear()
+        self._pending.clear()
+
+    async def setup(self) -> None:
+        """Setup the chunking service.
+
+        Workers are started on the first request made for each shard.
+        """
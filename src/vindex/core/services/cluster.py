@@ -0,0 +1,236 @@
+import asyncio
+import collections.abc
+import inspect
+import itertools
+import logging
+import typing
+
+from vindex.cluster import (
+    MAX_MESSAGE_SIZE,
+    Message,
+    WorkerInfo,
+    read_messages,
+    send_message,
+)
+from vindex.core.services.proto import Service
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+type QueryHandler = collections.abc.Callable[[typing.Any], typing.Any]
+"""A function answering a query, possibly a coroutine function."""
+
+type EventListener = collections.abc.Callable[[typing.Any], typing.Any]
+"""A function called when an event is dispatched, possibly a coroutine function."""
+
+
+class ClusterService(Service):
+    """Service used to communicate with the other clusters, when running in cluster mode.
+
+    When running as a single process, queries are only answered by this process and events
+    are not sent anywhere.
+    """
+
+    info: WorkerInfo | None
+    """The information of this cluster. None when running as a single process."""
+
+    _queries: dict[str, QueryHandler]
+    _listeners: collections.defaultdict[str, list[EventListener]]
+    _results: dict[int, asyncio.Future[dict[int, typing.Any]]]
+    _writer: asyncio.StreamWriter | None
+    _reader_task: asyncio.Task[None] | None
+    _tasks: set[asyncio.Task[None]]
+
+    def __init__(self, bot: "Vindex", info: WorkerInfo | None = None) -> None:
+        self.bot = bot
+        self.info = info
+        self._queries = {"guild_count": lambda _: len(self.bot.guilds), "info": self._info}
+        self._listeners = collections.defaultdict(list)
+        self._results = {}
+        self._writer = None
+        self._reader_task = None
+        self._tasks = set()
+        self._nonces = itertools.count()
+
+    @property
+    def cluster_id(self) -> int:
+        """The ID of this cluster. Always 0 when running as a single process."""
+        return self.info.cluster_id if self.info else 0
+
+    @property
+    def connected(self) -> bool:
+        """Whether this cluster is connected to the launcher."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    def add_query(self, name: str, handler: QueryHandler) -> None:
+        """Register the function answering a query. Replaces any existing one."""
+        self._queries[name] = handler
+
+    def remove_query(self, name: str) -> None:
+        """Unregister the function answering a query."""
+        self._queries.pop(name, None)
+
+    def add_listener(self, event: str, listener: EventListener) -> None:
+        """Register a function called when an event is dispatched by another cluster."""
+        self._listeners[event].append(listener)
+
+    def remove_listener(self, event: str, listener: EventListener) -> None:
+        """Unregister a function called when an event is dispatched by another cluster."""
+        if listener in self._listeners[event]:
+            self._listeners[event].remove(listener)
+
+    async def query(
+        self, name: str, data: typing.Any = None, *, timeout: float = 5.0
+    ) -> dict[int, typing.Any]:
+        """Ask every cluster, including this one, to answer a query.
+
+        Parameters
+        ----------
+        name : str
+            The name of the query.
+        data : Any
+            JSON-serializable data given to the query's handler.
+        timeout : float
+            The number of seconds to wait for the clusters to answer.
+
+        Returns
+        -------
+        dict of int to Any
+            The answer of each cluster, by cluster ID. Clusters that did not answer in time,
+            or that failed to, are given None.
+        """
+        if not self.connected:
+            return {self.cluster_id: await self._answer(name, data)}
+
+        assert self._writer
+        nonce = next(self._nonces)
+        future: asyncio.Future[dict[int, typing.Any]] = asyncio.get_running_loop().create_future()
+        self._results[nonce] = future
+        try:
+            await send_message(
+                self._writer,
+                {"op": "query", "nonce": nonce, "name": name, "data": data, "timeout": timeout},
+            )
+            # The hub enforces the timeout, leave it some time to answer.
+            return await asyncio.wait_for(future, timeout=timeout + 5.0)
+        finally:
+            del self._results[nonce]
+
+    async def guild_count(self) -> int:
+        """Return the number of guilds of every cluster."""
+        return sum(count for count in (await self.query("guild_count")).values() if count)
+
+    async def dispatch(self, event: str, data: typing.Any = None) -> None:
+        """Dispatch an event to every other cluster.
+
+        Parameters
+        ----------
+        event : str
+            The name of the event.
+        data : Any
+            JSON-serializable data given to the event's listeners.
+        """
+        if self.connected:
+            assert self._writer
+            await send_message(self._writer, {"op": "dispatch", "event": event, "data": data})
+
+    async def request_stop(self) -> bool:
+        """Ask the launcher to stop every cluster.
+
+        Returns
+        -------
+        bool
+            Whether the request was sent. False when running as a single process.
+        """
+        if not self.connected:
+            return False
+        assert self._writer
+        await send_message(self._writer, {"op": "stop"})
+        return True
+
+    def _info(self, _: typing.Any) -> dict[str, typing.Any]:
+        shard_ids = self.info.shard_ids if self.info else list(self.bot.shards)
+        return {
+            "shards": shard_ids,
+            "guilds": len(self.bot.guilds),
+            "latency": self.bot.latency,
+        }
+
+    async def _answer(self, name: str, data: typing.Any) -> typing.Any:
+        handler = self._queries.get(name)
+        if handler is None:
+            _log.warning("No handler for cluster query %s.", name)
+            return None
+        try:
+            result = handler(data)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception:  # pylint: disable=broad-exception-caught
+            _log.exception("Failed to answer cluster query %s.", name)
+            return None
+        return result
+
+    async def _on_query(self, message: Message) -> None:
+        value = await self._answer(message["name"], message["data"])
+        if self.connected:
+            assert self._writer
+            await send_message(
+                self._writer, {"op": "reply", "nonce": message["nonce"], "value": value}
+            )
+
+    async def _on_dispatch(self, message: Message) -> None:
+        for listener in list(self._listeners[message["event"]]):
+            try:
+                result = listener(message["data"])
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-exception-caught
+                _log.exception("Failed to handle cluster event %s.", message["event"])
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        async for message in read_messages(reader):
+            match message.get("op"):
+                case "query":
+                    task = asyncio.create_task(self._on_query(message))
+                case "dispatch":
+                    task = asyncio.create_task(self._on_dispatch(message))
+                case "result":
+                    future = self._results.get(message["nonce"])
+                    if future and not future.done():
+                        future.set_result(
+                            {
+                                int(cluster_id): value
+                                for cluster_id, value in message["values"].items()
+                            }
+                        )
+                    continue
+                case _:
+                    continue
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        _log.error("Lost the connection to the cluster launcher.")
+        if self._writer:
+            # Queries are answered locally from now on.
+            self._writer.close()
+
+    async def setup(self) -> None:
+        """Setup the cluster service, connecting to the launcher if running in cluster mode."""
+        if not self.info:
+            return
+        reader, self._writer = await asyncio.open_connection(
+            self.info.ipc_host, self.info.ipc_port, limit=MAX_MESSAGE_SIZE
+        )
+        await send_message(
+            self._writer,
+            {"op": "identify", "cluster": self.info.cluster_id, "token": self.info.ipc_token},
+        )
+        self._reader_task = asyncio.create_task(self._read(reader))
+        _log.info(
+            "Cluster %s connected to the launcher, with shards %s to %s.",
+            self.info.cluster_id,
+            self.info.shard_ids[0],
+            self.info.shard_ids[-1],
+        )
@@ -1,7 +1,9 @@
 import collections.abc
+import importlib.util
 import keyword
 import logging
 import pkgutil
+import time
 import typing
 
 from discord.ext import commands
@@ -45,8 +47,28 @@ class CogsManager(Service):
     Needed as it interacts with the database too.
     """
 
+    # Extensions may use any other service once loaded.
+    dependencies = (
+        "allowance",
+        "blacklist",
+        "chunking",
+        "cluster",
+        "core_settings",
+        "i18n",
+        "metrics",
+        "notifier",
+        "outbox",
+        "users",
+        "watchdog",
+    )
+    setup_timeout = 120.0
+
+    load_times: dict[str, float]
+    """Seconds each extension took to load on its latest load."""
+
     def __init__(self, bot: "Vindex") -> None:
         self.bot = bot
+        self.load_times = {}
         super().__init__()
 
     def available_modules(self) -> list[str]:
@@ -61,7 +83,12 @@ class CogsManager(Service):
         return modules
 
     async def load(
-        self, cogs: collections.abc.Iterable[str], /, *, append_db: bool = True
+        self,
+        cogs: collections.abc.Iterable[str],
+        /,
+        *,
+        append_db: bool = True,
+        broadcast: bool = True,
     ) -> ReturnLoad:
         """Load a cog using its module name.
 
@@ -71,6 +98,8 @@ class CogsManager(Service):
             The name of the cogs to load.
         append_db : bool
             Whether to append the cog to the database or not once loaded.
+        broadcast : bool
+            Whether to load the cogs in the other clusters too.
 
         Returns
         -------
@@ -83,12 +112,22 @@ class CogsManager(Service):
         already_loaded: list[str] = []
         failed: list[str] = []
 
-        for cog in cogs:
+        # Resolve everything before loading anything.
+        to_load: list[str] = []
+        for cog in dict.fromkeys(cogs):
+            if cog in self.bot.extensions:
+                already_loaded.append(cog)
+            elif not self._exists(cog):
+                not_found.append(cog)
+            else:
+                to_load.append(cog)
+
+        # Loaded one after the other, as discord.py executes each extension's module itself.
+        for cog in to_load:
+            start = time.perf_counter()
             try:
                 await self.bot.load_extension(cog)
                 loaded.append(cog)
-                if append_db:
-                    await LoadedCog.prisma().create(data={"name": cog})
             except (commands.errors.ExtensionNotFound, ModuleNotFoundError):
                 not_found.append(cog)
             except commands.errors.ExtensionAlreadyLoaded:
@@ -96,17 +135,30 @@ class CogsManager(Service):
             except commands.errors.ExtensionError:
                 _log.error("An error occured while loading %s", cog, exc_info=True)
                 failed.append(cog)
+            else:
+                self.load_times[cog] = time.perf_counter() - start
+                _log.debug("Loaded %s in %.3fs.", cog, self.load_times[cog])
+
+        if append_db and loaded:
+            await LoadedCog.prisma().create_many(
+                data=[{"name": cog} for cog in loaded], skip_duplicates=True
+            )
+        if broadcast and loaded:
+            await self._dispatch("load", loaded)
+
         return ReturnLoad(
             loaded=loaded, not_found=not_found, already_loaded=already_loaded, failed=failed
         )
 
-    async def reload(self, cogs: collections.abc.Iterable[str]):
+    async def reload(self, cogs: collections.abc.Iterable[str], /, *, broadcast: bool = True):
         """Reload a cog using its module name.
 
         Parameters
         ----------
         cogs : str
             The name of the cogs to reload.
+        broadcast : bool
+            Whether to reload the cogs in the other clusters too.
 
         Returns
         -------
@@ -118,28 +170,39 @@ class CogsManager(Service):
         reloaded: list[str] = []
         not_found: list[str] = []
         failed: list[str] = []
+        not_loaded: list[str] = []
 
         for cog in cogs:
+            start = time.perf_counter()
             try:
                 await self.bot.reload_extension(cog)
                 reloaded.append(cog)
             except (commands.errors.ExtensionNotFound, ModuleNotFoundError):
                 not_found.append(cog)
             except commands.errors.ExtensionNotLoaded:
-                result = await self.load(cog)
-                if result["not_found"]:
-                    not_found.append(cog)
-                if result["failed"]:
-                    failed.append(cog)
-                if result["loaded"]:
-                    reloaded.append(cog)
+                not_loaded.append(cog)
             except commands.errors.ExtensionError:
                 _log.error("An error occured while reloading %s", cog, exc_info=True)
                 failed.append(cog)
+            else:
+                self.load_times[cog] = time.perf_counter() - start
+
+        if broadcast and reloaded:
+            await self._dispatch("reload", reloaded)
+        if not_loaded:
+            result = await self.load(not_loaded, broadcast=broadcast)
+            not_found.extend(result["not_found"])
+            failed.extend(result["failed"])
+            reloaded.extend(result["loaded"])
         return ReturnReload(reloaded=reloaded, not_found=not_found, failed=failed)
 
     async def unload(
-        self, cogs: collections.abc.Iterable[str], /, *, append_db: bool = True
+        self,
+        cogs: collections.abc.Iterable[str],
+        /,
+        *,
+        append_db: bool = True,
+        broadcast: bool = True,
     ) -> ReturnUnload:
         """Unload a cog using its module name.
 
@@ -149,6 +212,8 @@ class CogsManager(Service):
             The name of the cogs to unload.
         append_db : bool
             Whether to append the cog to the database or not once unloaded.
+        broadcast : bool
+            Whether to unload the cogs in the other clusters too.
 
         Returns
         -------
@@ -164,15 +229,43 @@ class CogsManager(Service):
             try:
                 await self.bot.unload_extension(cog)
                 unloaded.append(cog)
-                if append_db:
-                    await LoadedCog.prisma().delete(where={"name": cog})
+                self.load_times.pop(cog, None)
             except (commands.errors.ExtensionNotFound, ModuleNotFoundError):
                 not_found.append(cog)
             except commands.errors.ExtensionNotLoaded:
                 not_loaded.append(cog)
 
+        if append_db and unloaded:
+            await LoadedCog.prisma().delete_many(where={"name": {"in": unloaded}})
+        if broadcast and unloaded:
+            await self._dispatch("unload", unloaded)
+
         return ReturnUnload(unloaded=unloaded, not_found=not_found, not_loaded=not_loaded)
 
+    async def _dispatch(self, action: str, cogs: list[str]) -> None:
+        await self.bot.services.cluster.dispatch(
+            "extensions_update", {"action": action, "cogs": cogs}
+        )
+
+    async def _on_extensions_update(self, data: dict[str, typing.Any]) -> None:
+        # The cluster that made the change already updated the database.
+        match data["action"]:
+            case "load":
+                await self.load(data["cogs"], append_db=False, broadcast=False)
+            case "reload":
+                await self.reload(data["cogs"], broadcast=False)
+            case "unload":
+                await self.unload(data["cogs"], append_db=False, broadcast=False)
+            case action:
+                _log.warning("Unknown extensions update: %s", action)
+
+    @staticmethod
+    def _exists(name: str) -> bool:
+        try:
+            return importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            return False
+
     # async def compare(self) -> CompareDict:
     #     """Compare the cogs list inside the database with the loaded cogs."""
     #     cogs = await ExternalCog.prisma().find_many()
@@ -186,6 +279,10 @@ class CogsManager(Service):
     #     }
 
     async def setup(self) -> None:
-        """Setup the cogs manager service."""
-        cogs = await LoadedCog.prisma().find_many()
-        await self.load([cog.name for cog in cogs], append_db=False)
+        """Setup the cogs manager service.
+
+        Cogs loaded, reloaded or unloaded by another cluster are in this one too.
+        """
+        self.bot.services.cluster.add_listener("extensions_update", self._on_extensions_update)
+        cogs = await LoadedCog.prisma(self.bot.reader()).find_many()
+        await self.load([cog.name for cog in cogs], append_db=False, broadcast=False)
@@ -0,0 +1,65 @@
+import typing
+
+from prisma.models import Core
+from vindex.core.services.proto import Service
+
+if typing.TYPE_CHECKING:
+    from prisma.types import CoreUpdateInput
+    from vindex.core.bot import Vindex
+
+
+class CoreSettings(Service):
+    """Service keeping the bot's core settings (The single ``Core`` row) in memory.
+
+    Updates are written to the database before being applied to the cached row. The other
+    clusters are then told to read the row again.
+    """
+
+    dependencies = ("cluster",)
+
+    _core: Core
+
+    def __init__(self, bot: "Vindex") -> None:
+        self.bot = bot
+
+    @property
+    def notify_channel(self) -> int | None:
+        """The ID of the channel where core notifications are sent."""
+        return self._core.notifyChannel
+
+    @property
+    def invite_permission_code(self) -> int | None:
+        """The permissions code to use for the invite link."""
+        return self._core.invitePermissionCode
+
+    async def update(self, data: "CoreUpdateInput") -> Core:
+        """Update the core settings.
+
+        Parameters
+        ----------
+        data : prisma.types.CoreUpdateInput
+            The fields to update.
+
+        Returns
+        -------
+        prisma.models.Core
+            The updated row.
+        """
+        core = await Core.prisma().update(where={"id": 1}, data=data)
+        assert core
+        self._core = core
+        await self.bot.services.cluster.dispatch("core_settings_update")
+        return core
+
+    async def _on_update(self, _: typing.Any) -> None:
+        # Read from the primary, a replica may not have the update yet.
+        core = await Core.prisma().find_unique(where={"id": 1})
+        if core:
+            self._core = core
+
+    async def setup(self) -> None:
+        """Setup the core settings service, ensuring the Core row exists."""
+        self.bot.services.cluster.add_listener("core_settings_update", self._on_update)
+        self._core = await Core.prisma().upsert(
+            where={"id": 1}, data={"create": {"id": 1}, "update": {}}
+        )
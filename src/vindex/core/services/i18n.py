@@ -1,10 +1,19 @@
+import array
+import asyncio
+import bisect
+import collections
+import collections.abc
+import functools
 import logging
+import random
+import sys
 import typing
 
 from prisma.models import Guild
 from prisma.partials import GuildWithLocale
-from vindex.core.i18n import Languages
+from vindex.core.i18n import Languages, warm_babel_locales
 from vindex.core.services.proto import Service
+from vindex.core.utils.batching import ModelLoader
 
 if typing.TYPE_CHECKING:
     from vindex.core.bot import Vindex
@@ -12,15 +21,148 @@ if typing.TYPE_CHECKING:
 
 _log = logging.getLogger(__name__)
 
+DEFAULT_LOCALE = Languages.ENGLISH
+
+_LANGUAGES = tuple(Languages)
+_LANGUAGE_INDEXES = {language: index for index, language in enumerate(_LANGUAGES)}
+
+
+class GuildLocaleStore:
+    """Compact store of the guilds' locales.
+
+    Only guilds with a locale other than the default one are stored, as sorted guild IDs and
+    language indexes kept in two arrays (9 bytes per guild).
+
+    If the store is complete, guilds that are not stored use the default locale. Otherwise, the
+    store was capped and some guilds are unknown, and must be read from the database.
+    """
+
+    max_size: int | None
+    """The maximum number of guilds stored. None if unbounded."""
+
+    complete: bool
+    """Whether every guild with a non-default locale is stored."""
+
+    _ids: array.array[int]
+    _locales: array.array[int]
+    _known_defaults: collections.OrderedDict[int, None]
+
+    def __init__(self, *, max_size: int | None = None) -> None:
+        self.max_size = max_size
+        self.complete = True
+        self._ids = array.array("Q")
+        self._locales = array.array("B")
+        self._known_defaults = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def memory_usage(self) -> int:
+        """The approximate number of bytes used by the store."""
+        return (
+            sys.getsizeof(self._ids)
+            + sys.getsizeof(self._locales)
+            + sys.getsizeof(self._known_defaults)
+        )
+
+    def get(self, guild_id: int, /) -> Languages | None:
+        """Get the locale of a guild.
+
+        Returns
+        -------
+        Languages or None
+            The locale of the guild. None if the store is not complete and the guild is unknown.
+        """
+        index = bisect.bisect_left(self._ids, guild_id)
+        if index < len(self._ids) and self._ids[index] == guild_id:
+            return _LANGUAGES[self._locales[index]]
+        if self.complete or guild_id in self._known_defaults:
+            return DEFAULT_LOCALE
+        return None
+
+    def set(self, guild_id: int, locale: Languages, /) -> None:
+        """Set the locale of a guild.
+
+        If the store is full, a random guild is evicted and the store becomes incomplete.
+        """
+        index = bisect.bisect_left(self._ids, guild_id)
+        stored = index < len(self._ids) and self._ids[index] == guild_id
+
+        if locale is DEFAULT_LOCALE:
+            if stored:
+                del self._ids[index]
+                del self._locales[index]
+            if not self.complete:
+                self._remember_default(guild_id)
+            return
+
+        self._known_defaults.pop(guild_id, None)
+        if stored:
+            self._locales[index] = _LANGUAGE_INDEXES[locale]
+            return
+
+        if self.max_size is not None and len(self._ids) >= self.max_size:
+            evicted = random.randrange(len(self._ids))
+            del self._ids[evicted]
+            del self._locales[evicted]
+            self.complete = False
+            if evicted < index:
+                index -= 1
+        self._ids.insert(index, guild_id)
+        self._locales.insert(index, _LANGUAGE_INDEXES[locale])
+
+    def load(self, locales: collections.abc.Iterable[tuple[int, Languages]], /) -> None:
+        """Replace the content of the store.
+
+        Parameters
+        ----------
+        locales : Iterable of tuple of int and Languages
+            Every guild with a non-default locale, with its locale. If there are more guilds
+            than the store's maximum size, the extra guilds are left out and the store is
+            marked as incomplete.
+        """
+        entries = sorted(
+            (guild_id, _LANGUAGE_INDEXES[locale])
+            for guild_id, locale in locales
+            if locale is not DEFAULT_LOCALE
+        )
+        self.complete = self.max_size is None or len(entries) <= self.max_size
+        if not self.complete:
+            assert self.max_size is not None
+            entries = random.sample(entries, self.max_size)
+            entries.sort()
+        self._ids = array.array("Q", (guild_id for guild_id, _ in entries))
+        self._locales = array.array("B", (locale for _, locale in entries))
+        self._known_defaults.clear()
+
+    def _remember_default(self, guild_id: int) -> None:
+        # Bounded by the same size as the store, so defaults read from the database are not
+        # queried again right away.
+        self._known_defaults[guild_id] = None
+        self._known_defaults.move_to_end(guild_id)
+        if len(self._known_defaults) > (self.max_size or 0):
+            self._known_defaults.popitem(last=False)
+
 
 class I18nService(Service):
     """Utility class used to translate strings."""
 
-    _cache: dict[int, "Languages"]
+    store: GuildLocaleStore
+    """The guilds' locales."""
+
+    _faulting: set[int]
+    _tasks: set[asyncio.Task[Languages]]
+    _warmup: asyncio.Task[None] | None
+    _loader: ModelLoader[Guild]
 
-    def __init__(self, bot: "Vindex") -> None:
+    def __init__(self, bot: "Vindex", *, max_guilds: int | None = None) -> None:
         self.bot = bot
-        self._cache = {}
+        self.store = GuildLocaleStore(max_size=max_guilds)
+        self._faulting = set()
+        self._tasks = set()
+        self._warmup = None
+        self._loader = ModelLoader(Guild, client=bot.reader)
 
     async def set_guild_locale(self, guild_id: int, locale: "Languages") -> None:
         """Set the locale for a guild."""
@@ -37,24 +179,67 @@ class I18nService(Service):
                 "update": {"locale": locale.value},
             },
         )
-        self._cache[guild_id] = locale
+        self.store.set(guild_id, locale)
 
     async def get_guild_locale(self, guild_id: int) -> "Languages":
-        """Get the locale for a guild."""
-        if guild_id in self._cache:
-            _log.debug("Using cached locale for guild %s", guild_id)
-            return self._cache[guild_id]
-        guild_data = await Guild.prisma().find_unique(
-            where={"id": str(guild_id)},
-        )
-        locale = Languages.ENGLISH if not guild_data else Languages(guild_data.locale)
+        """Get the locale for a guild.
+
+        The database is only queried if the store is capped and the guild is unknown. Guilds
+        read at the same time are read with a single query.
+        """
+        locale = self.store.get(guild_id)
+        if locale is not None:
+            return locale
+        guild_data = await self._loader.load(guild_id)
+        locale = DEFAULT_LOCALE if not guild_data else Languages(guild_data.locale)
         _log.debug("Cached locale for guild %s: %s", guild_id, locale)
-        self._cache[guild_id] = locale
+        self.store.set(guild_id, locale)
         return locale
 
+    def get_cached_guild_locale(self, guild_id: int) -> "Languages":
+        """Get the locale for a guild, without ever querying the database.
+
+        Every guild with a locale is cached on setup, so a guild missing from the cache uses the
+        default locale. If the store is capped and the guild is unknown, the default locale is
+        returned while the guild's locale is read in the background.
+        """
+        locale = self.store.get(guild_id)
+        if locale is not None:
+            return locale
+        if guild_id not in self._faulting:
+            self._faulting.add(guild_id)
+            task = asyncio.create_task(self.get_guild_locale(guild_id))
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._on_fault_in_done, guild_id))
+        return DEFAULT_LOCALE
+
+    def _on_fault_in_done(self, guild_id: int, task: asyncio.Task[Languages]) -> None:
+        self._tasks.discard(task)
+        self._faulting.discard(guild_id)
+        if not task.cancelled() and (exception := task.exception()):
+            # The guild uses the default locale until it is read again.
+            _log.error("Failed to read the locale of guild %s.", guild_id, exc_info=exception)
+
+    @staticmethod
+    def _on_warmup_done(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and (exception := task.exception()):
+            # Locales are then loaded on first use, formatting still works.
+            _log.error("Failed to warm the Babel locales up.", exc_info=exception)
+
     async def setup(self) -> None:
-        """Setup the i18n service."""
-        guilds = await GuildWithLocale.prisma().find_many()
-        for guild in guilds:
-            self._cache[int(guild.id)] = Languages(guild.locale)
-        _log.debug("Done caching all guilds locale.")
+        """Setup the i18n service.
+
+        Babel locales are loaded in a thread in the background.
+        """
+        self._warmup = asyncio.create_task(asyncio.to_thread(warm_babel_locales))
+        self._warmup.add_done_callback(self._on_warmup_done)
+        guilds = await GuildWithLocale.prisma(self.bot.reader()).find_many(
+            where={"locale": {"not": DEFAULT_LOCALE.value}}
+        )
+        self.store.load((int(guild.id), Languages(guild.locale)) for guild in guilds)
+        _log.debug(
+            "Done caching %s guilds locale (%s bytes, complete: %s).",
+            len(self.store),
+            self.store.memory_usage,
+            self.store.complete,
+        )
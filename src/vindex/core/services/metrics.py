@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import typing
+
+from vindex.core.metrics import Counter, Gauge, Histogram, Registry
+from vindex.core.services.proto import Service
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+    from vindex.database import VindexClient
+
+
+_log = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class MetricsService(Service):
+    """Service collecting the bot's metrics, and serving them in the Prometheus text format.
+
+    Metrics are always collected. The HTTP endpoint is only started if a port is set, with the
+    ``VINDEX_METRICS_PORT`` environment variable. In cluster mode, each cluster listens on that
+    port plus its cluster ID.
+    """
+
+    dependencies = ("cluster",)
+
+    registry: Registry
+
+    commands: Histogram
+    queries: Histogram
+    query_errors: Counter
+    loop_lag: Histogram
+    recent_loop_lag: Gauge
+    gateway_latency: Gauge
+    guilds: Gauge
+    cache_entries: Gauge
+    cache_hits: Counter
+    cache_misses: Counter
+    cache_hit_ratio: Gauge
+    queue_depth: Gauge
+    outbox_depth: Gauge
+
+    _server: asyncio.Server | None
+
+    def __init__(self, bot: "Vindex") -> None:
+        self.bot = bot
+        self._server = None
+
+        self.registry = registry = Registry()
+        self.commands = registry.register(
+            Histogram(
+                "vindex_command_duration_seconds",
+                "Duration of commands, by name and outcome.",
+                ("command", "outcome"),
+            )
+        )
+        self.queries = registry.register(
+            Histogram(
+                "vindex_db_query_duration_seconds",
+                "Duration of database queries, by model and operation.",
+                ("model", "operation"),
+            )
+        )
+        self.query_errors = registry.register(
+            Counter(
+                "vindex_db_query_errors_total",
+                "Failed database queries, by model and operation.",
+                ("model", "operation"),
+            )
+        )
+        self.loop_lag = registry.register(
+            Histogram(
+                "vindex_event_loop_lag_seconds",
+                "Delay of the event loop in running a scheduled callback.",
+                buckets=LAG_BUCKETS,
+            )
+        )
+        self.recent_loop_lag = registry.register(
+            Gauge(
+                "vindex_event_loop_lag_recent_seconds",
+                "Percentiles of the event loop's lag over the last minute.",
+                ("quantile",),
+            )
+        )
+        self.gateway_latency = registry.register(
+            Gauge(
+                "vindex_gateway_latency_seconds",
+                "Latency between a heartbeat and its acknowledgement, by shard.",
+                ("shard",),
+            )
+        )
+        self.guilds = registry.register(Gauge("vindex_guilds", "Number of guilds."))
+        self.cache_entries = registry.register(
+            Gauge("vindex_cache_entries", "Number of entries in a cache.", ("cache",))
+        )
+        self.cache_hits = registry.register(
+            Counter("vindex_cache_hits_total", "Lookups answered by a cache.", ("cache",))
+        )
+        self.cache_misses = registry.register(
+            Counter("vindex_cache_misses_total", "Lookups missed by a cache.", ("cache",))
+        )
+        self.cache_hit_ratio = registry.register(
+            Gauge("vindex_cache_hit_ratio", "Ratio of lookups answered by a cache.", ("cache",))
+        )
+        self.queue_depth = registry.register(
+            Gauge("vindex_queue_depth", "Number of items waiting in a queue.", ("queue",))
+        )
+        self.outbox_depth = registry.register(
+            Gauge(
+                "vindex_outbox_queue_depth",
+                "Number of messages waiting to be sent, by rate limit bucket.",
+                ("bucket",),
+            )
+        )
+        registry.add_collector(self._collect)
+
+    def observe_command(self, command: str, failed: bool, duration: float) -> None:
+        """Record the duration of a command."""
+        self.commands.observe(duration, command, "error" if failed else "success")
+
+    def observe_query(
+        self, model: str | None, operation: str, duration: float, failed: bool
+    ) -> None:
+        """Record the duration of a database query."""
+        model = model or "raw"
+        self.queries.observe(duration, model, operation)
+        if failed:
+            self.query_errors.inc(model, operation)
+
+    def _collect(self) -> None:
+        self.gateway_latency.clear()
+        for shard_id, latency in self.bot.latencies:
+            self.gateway_latency.set(latency, str(shard_id))
+        self.guilds.set(len(self.bot.guilds))
+        for quantile, lag in self.bot.services.watchdog.percentiles().items():
+            self.recent_loop_lag.set(lag, quantile)
+
+        services = self.bot.services
+        self.cache_entries.set(len(services.users.users), "users")
+        self.cache_entries.set(len(services.users.members), "members")
+        self.cache_entries.set(len(services.i18n.store), "guild_locales")
+        self.cache_entries.set(len(services.allowance), "guild_allowances")
+        self.cache_entries.set(len(services.blacklist.blacklisted_ids), "blacklist")
+        for name, stats in (
+            ("users", services.users.user_stats),
+            ("members", services.users.member_stats),
+        ):
+            self.cache_hits.set(stats.hits + stats.coalesced, name)
+            self.cache_misses.set(stats.misses, name)
+            self.cache_hit_ratio.set(stats.hit_rate, name)
+
+        if profiles := getattr(self.bot.get_cog("GlobalProfile"), "cache", None):
+            total = profiles.hits + profiles.misses
+            self.cache_entries.set(len(profiles.profiles), "profiles")
+            self.cache_entries.set(len(profiles.embeds), "profile_embeds")
+            self.cache_hits.set(profiles.hits, "profiles")
+            self.cache_misses.set(profiles.misses, "profiles")
+            self.cache_hit_ratio.set(profiles.hits / total if total else 0.0, "profiles")
+
+        self.queue_depth.set(services.chunking.queue_depth, "chunking")
+        self.queue_depth.set(services.chunking.in_flight, "chunking_in_flight")
+        self.queue_depth.set(services.notifier.queue_depth, "notifier")
+        self.queue_depth.set(services.outbox.queue_depth, "outbox")
+        self.outbox_depth.clear()
+        for bucket, depth in services.outbox.queue_depths().items():
+            self.outbox_depth.set(depth, bucket)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Headers are not used.
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+
+            method, path, *_ = request_line.decode("latin-1").split() or ("", "")
+            if method in ("GET", "HEAD") and path.split("?")[0] == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+                body = self.registry.render().encode()
+            else:
+                status, content_type = "404 Not Found", "text/plain; charset=utf-8"
+                body = b"Not Found\n"
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                ).encode()
+            )
+            if method != "HEAD":
+                writer.write(body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self) -> None:
+        """Stop serving metrics."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def setup(self) -> None:
+        """Setup the metrics service, starting the HTTP endpoint if a port is set."""
+        clients = typing.cast("list[VindexClient | None]", [self.bot.database, self.bot.replica])
+        for client in clients:
+            if client is not None and hasattr(client, "query_hooks"):
+                client.query_hooks.append(self.observe_query)
+        self.bot.services.watchdog.lag_hooks.append(self.loop_lag.observe)
+
+        port = self.bot.settings.metrics_port
+        if port is None:
+            return
+        port += self.bot.services.cluster.cluster_id
+        self._server = await asyncio.start_server(
+            self._handle, self.bot.settings.metrics_host, port
+        )
+        _log.info("Serving metrics on http://%s:%s/metrics", self.bot.settings.metrics_host, port)
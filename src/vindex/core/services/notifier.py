@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import typing
+
+import discord
+
+from vindex.core.services.proto import Service
+from vindex.core.utils.futures import set_exceptions, set_results
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+    from vindex.core.core_types import SendMethodDict
+
+
+_log = logging.getLogger(__name__)
+
+MAX_EMBEDS = 10
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS_LENGTH = 6000
+_MERGEABLE_KEYS = frozenset(("content", "embeds"))
+
+type _Notification = tuple["SendMethodDict", asyncio.Future[discord.Message | None]]
+
+
+class NotifierService(Service):
+    """Service sending core notifications through a queue.
+
+    A notification is sent right away when nothing else is being sent. Notifications queued
+    while a send is in flight are packed into as few messages as possible once it is done, up
+    to Discord's limit of embeds and characters per message, and of characters across a
+    message's embeds.
+    """
+
+    dependencies = ("core_settings", "outbox")
+
+    _queue: asyncio.Queue[_Notification]
+    _worker: asyncio.Task[None] | None
+
+    def __init__(self, bot: "Vindex") -> None:
+        self.bot = bot
+        self._queue = asyncio.Queue()
+        self._worker = None
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of notifications waiting to be sent."""
+        return self._queue.qsize()
+
+    async def notify(self, **kwargs: typing.Unpack["SendMethodDict"]) -> discord.Message | None:
+        """Queue a notification and wait for it to be sent.
+
+        Parameters
+        ----------
+        **kwargs:
+            Same argument as :py:meth:`discord.abc.Messageable.send`. Typed.
+
+        Returns
+        -------
+        discord.Message or None
+            The message the notification was sent in, possibly shared with other notifications.
+            None if no channel were set.
+        """
+        future: asyncio.Future[discord.Message | None] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((kwargs, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Notifications queued while the previous batch was being sent.
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._flush(batch)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                # Callers would wait forever otherwise.
+                _log.exception("Failed to send %s core notification(s).", len(batch))
+                set_exceptions((future for _, future in batch), exception)
+
+    async def _flush(self, batch: list[_Notification]) -> None:
+        channel_id = self.bot.services.core_settings.notify_channel
+        if channel_id is None:
+            _log.error(
+                "An attempt was made to send %s core notification(s), but no channel was set. "
+                "Ignoring.",
+                len(batch),
+            )
+            set_results((future for _, future in batch), None)
+            return
+
+        # The channel's guild may be in another cluster's cache, it is not needed to send.
+        channel = self.bot.get_partial_messageable(channel_id)
+        for payload, futures in self._pack(batch):
+            try:
+                message = await self.bot.services.outbox.send(channel, **payload)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                _log.error("Failed to send a core notification.", exc_info=True)
+                set_exceptions(futures, exception)
+            else:
+                set_results(futures, message)
+
+    @staticmethod
+    def _pack(
+        batch: list[_Notification],
+    ) -> list[tuple["SendMethodDict", list[asyncio.Future[discord.Message | None]]]]:
+        packed: list[tuple["SendMethodDict", list[asyncio.Future[discord.Message | None]]]] = []
+        current: "SendMethodDict | None" = None
+
+        for kwargs, future in batch:
+            if not kwargs.keys() <= _MERGEABLE_KEYS:
+                # Files, views and such are sent on their own.
+                packed.append((kwargs, [future]))
+                current = None
+                continue
+
+            if current is not None:
+                embeds = [*current.get("embeds", ()), *kwargs.get("embeds", ())]
+                content = "\n".join(
+                    text for text in (current.get("content"), kwargs.get("content")) if text
+                )
+                if (
+                    len(embeds) <= MAX_EMBEDS
+                    and sum(map(len, embeds)) <= MAX_EMBEDS_LENGTH
+                    and len(content) <= MAX_CONTENT_LENGTH
+                ):
+                    if embeds:
+                        current["embeds"] = embeds
+                    if content:
+                        current["content"] = content
+                    packed[-1][1].append(future)
+                    continue
+
+            current = {**kwargs}
+            packed.append((current, [future]))
+
+        return packed
+
+    async def setup(self) -> None:
+        """Setup the notifier service.
+
+        The queue is consumed by a worker started on the first notification.
+        """
@@ -0,0 +1,234 @@
+import asyncio
+import collections
+import logging
+import typing
+
+import discord
+from discord.http import Route
+
+from vindex.core.services.proto import Service
+from vindex.core.utils.futures import set_exceptions, set_results
+
+if typing.TYPE_CHECKING:
+    from discord.abc import MessageableChannel
+
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+MAX_CONTENT_LENGTH = 2000
+
+
+class _Outgoing:
+    """A message to send or to edit, and the future of the resulting message."""
+
+    __slots__ = ("kwargs", "future", "merge", "edited")
+
+    kwargs: dict[str, typing.Any]
+    future: asyncio.Future[discord.Message]
+    merge: bool
+    """Whether the message can be merged with the messages around it."""
+    edited: discord.Message | None
+    """The message to edit, None when sending a new one."""
+
+    def __init__(
+        self,
+        kwargs: dict[str, typing.Any],
+        *,
+        merge: bool = False,
+        edited: discord.Message | None = None,
+    ) -> None:
+        self.kwargs = kwargs
+        self.future = asyncio.get_running_loop().create_future()
+        self.merge = merge and kwargs.keys() == {"content"}
+        self.edited = edited
+
+
+class _ChannelQueue:
+    """Messages waiting to be sent to a channel, and the task sending them."""
+
+    __slots__ = ("channel", "items", "worker")
+
+    channel: "MessageableChannel"
+    items: collections.deque[_Outgoing]
+    worker: asyncio.Task[None] | None
+
+    def __init__(self, channel: "MessageableChannel") -> None:
+        self.channel = channel
+        self.items = collections.deque()
+        self.worker = None
+
+
+class OutboxService(Service):
+    """Service sending and editing messages through a queue per channel.
+
+    Messages to a channel are sent one at a time, in order. Before each request, the rate limit
+    bucket discord.py keeps for its route is read, and the queue waits for the bucket to reset
+    when none of its requests remain. Messages queued during that wait are not stuck in
+    discord.py's own wait: consecutive messages made only of text are merged once it is over,
+    up to Discord's limit of characters per message, so fewer requests are made.
+    """
+
+    _queues: dict[int, _ChannelQueue]
+
+    def __init__(self, bot: "Vindex") -> None:
+        self.bot = bot
+        self._queues = {}
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of messages waiting to be sent, in every channel."""
+        return sum(len(queue.items) for queue in self._queues.values())
+
+    def queue_depths(self) -> dict[str, int]:
+        """The number of messages waiting to be sent, by rate limit bucket.
+
+        Only buckets with messages waiting are included.
+        """
+        depths: dict[str, int] = {}
+        for channel_id, queue in self._queues.items():
+            for item in queue.items:
+                key = self._bucket_key(self._route(channel_id, item))
+                depths[key] = depths.get(key, 0) + 1
+        return depths
+
+    async def send(
+        self,
+        destination: discord.abc.Messageable,
+        content: str | None = None,
+        *,
+        merge: bool = True,
+        **kwargs: typing.Any,
+    ) -> discord.Message:
+        """Queue a message and wait for it to be sent.
+
+        Parameters
+        ----------
+        destination : discord.abc.Messageable
+            Where to send the message. Users and members are sent a private message.
+        content : str, optional
+            The content of the message.
+        merge : bool
+            Whether the message can be merged with other messages made only of text. Disable
+            this when the message is edited later, as it may be shared.
+        **kwargs:
+            Same argument as :py:meth:`discord.abc.Messageable.send`.
+
+        Returns
+        -------
+        discord.Message
+            The message sent, possibly shared with other messages merged into it.
+
+        Raises
+        ------
+        discord.HTTPException
+            Sending the message failed.
+        """
+        if content is not None:
+            kwargs["content"] = str(content)
+        channel = await destination._get_channel()  # pylint: disable=protected-access
+        return await self._queue(channel, _Outgoing(kwargs, merge=merge))
+
+    async def edit(self, message: discord.Message, /, **kwargs: typing.Any) -> discord.Message:
+        """Queue the edit of a message and wait for it to be done.
+
+        Parameters
+        ----------
+        message : discord.Message
+            The message to edit.
+        **kwargs:
+            Same argument as :py:meth:`discord.Message.edit`.
+
+        Returns
+        -------
+        discord.Message
+            The edited message.
+
+        Raises
+        ------
+        discord.HTTPException
+            Editing the message failed.
+        """
+        return await self._queue(message.channel, _Outgoing(kwargs, edited=message))
+
+    async def _queue(self, channel: "MessageableChannel", item: _Outgoing) -> discord.Message:
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = _ChannelQueue(channel)
+        queue.items.append(item)
+        if queue.worker is None:
+            queue.worker = asyncio.create_task(self._run(channel.id, queue))
+        # A cancelled caller must not cancel the messages merged with theirs.
+        return await asyncio.shield(item.future)
+
+    async def _run(self, channel_id: int, queue: _ChannelQueue) -> None:
+        try:
+            while queue.items:
+                await self._wait_for_bucket(self._route(channel_id, queue.items[0]))
+                item, futures = self._next(queue.items)
+                try:
+                    if item.edited:
+                        message = await item.edited.edit(**item.kwargs)
+                    else:
+                        message = await queue.channel.send(**item.kwargs)
+                except Exception as exception:  # pylint: disable=broad-exception-caught
+                    set_exceptions(futures, exception)
+                else:
+                    set_results(futures, message)
+        finally:
+            queue.worker = None
+            if self._queues.get(channel_id) is queue:
+                del self._queues[channel_id]
+
+    @staticmethod
+    def _next(
+        items: collections.deque[_Outgoing],
+    ) -> tuple[_Outgoing, list[asyncio.Future[discord.Message]]]:
+        item = items.popleft()
+        if not item.merge:
+            # Edits, files, embeds, views and such are sent on their own.
+            return item, [item.future]
+
+        content = item.kwargs["content"]
+        futures = [item.future]
+        while items and items[0].merge:
+            merged = f"{content}\n{items[0].kwargs['content']}"
+            if len(merged) > MAX_CONTENT_LENGTH:
+                break
+            content = merged
+            futures.append(items.popleft().future)
+        item.kwargs = {"content": content}
+        return item, futures
+
+    @staticmethod
+    def _route(channel_id: int, item: _Outgoing) -> Route:
+        if item.edited:
+            return Route(
+                "PATCH",
+                "/channels/{channel_id}/messages/{message_id}",
+                channel_id=channel_id,
+                message_id=item.edited.id,
+            )
+        return Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id)
+
+    def _bucket_key(self, route: Route) -> str:
+        # pylint: disable-next=protected-access
+        bucket_hash = self.bot.http._bucket_hashes.get(route.key, route.key)
+        return f"{bucket_hash}:{route.major_parameters}"
+
+    async def _wait_for_bucket(self, route: Route) -> None:
+        # pylint: disable-next=protected-access
+        ratelimit = self.bot.http._buckets.get(self._bucket_key(route))
+        if ratelimit is None or ratelimit.remaining > 0 or ratelimit.expires is None:
+            return
+        delay = ratelimit.expires - asyncio.get_running_loop().time()
+        if delay > 0:
+            _log.debug("Bucket %s is exhausted, waiting %.3fs.", route.key, delay)
+            await asyncio.sleep(delay)
+
+    async def setup(self) -> None:
+        """Setup the outbox service.
+
+        The queue of each channel is consumed by a worker started on its first message.
+        """
@@ -11,6 +11,12 @@ class Service(typing.Protocol):
     bot: "Vindex"
     """The bot instance."""
 
+    dependencies: typing.ClassVar[tuple[str, ...]] = ()
+    """The names of the services that must be set up before this one."""
+
+    setup_timeout: typing.ClassVar[float] = 30.0
+    """The maximum number of seconds the setup of the service can take."""
+
     @abc.abstractmethod
     async def setup(self) -> None:
         """Setup the service."""
@@ -1,12 +1,29 @@
+import asyncio
+import logging
+import time
 import typing
 
 from vindex.core.services.blacklist import BlacklistService
 
+from .allowance import GuildAllowanceService
+from .chunking import ChunkingService
+from .cluster import ClusterService
 from .cogs_manager import CogsManager
+from .core_settings import CoreSettings
 from .i18n import I18nService
+from .metrics import MetricsService
+from .notifier import NotifierService
+from .outbox import OutboxService
+from .users import UserResolverService
+from .watchdog import WatchdogService
 
 if typing.TYPE_CHECKING:
+    from vindex.cluster import WorkerInfo
     from vindex.core.bot import Vindex
+    from vindex.core.services.proto import Service
+
+
+_log = logging.getLogger(__name__)
 
 
 class ServiceProvider:
@@ -23,16 +40,125 @@ class ServiceProvider:
     cogs_manager: CogsManager
     """Cogs manager service"""
 
-    def __init__(self, bot: "Vindex") -> None:
+    chunking: ChunkingService
+    """Guild chunking service"""
+
+    core_settings: CoreSettings
+    """Core settings service"""
+
+    notifier: NotifierService
+    """Core notifications service"""
+
+    outbox: OutboxService
+    """Outbound messages service"""
+
+    allowance: GuildAllowanceService
+    """Guild allowance service"""
+
+    users: UserResolverService
+    """User and member resolution service"""
+
+    cluster: ClusterService
+    """Inter-cluster communication service"""
+
+    metrics: MetricsService
+    """Metrics service"""
+
+    watchdog: WatchdogService
+    """Event loop watchdog service"""
+
+    setup_timings: dict[str, float]
+    """Seconds each service took to set up, in order of completion."""
+
+    def __init__(self, bot: "Vindex", cluster: "WorkerInfo | None" = None) -> None:
+        self.core_settings = CoreSettings(bot)
+        self.notifier = NotifierService(bot)
+        self.outbox = OutboxService(bot)
         self.cogs_manager = CogsManager(bot)
         self.blacklist = BlacklistService(bot)
-        self.i18n = I18nService(bot)
+        self.i18n = I18nService(bot, max_guilds=bot.settings.max_cached_locales)
+        self.chunking = ChunkingService(bot)
+        self.allowance = GuildAllowanceService(bot)
+        self.users = UserResolverService(bot)
+        self.cluster = ClusterService(bot, cluster)
+        self.metrics = MetricsService(bot)
+        self.watchdog = WatchdogService(bot, threshold=bot.settings.loop_lag_threshold)
+        self.setup_timings = {}
+
+    @property
+    def all(self) -> dict[str, "Service"]:
+        """Every service, by name."""
+        return {
+            "core_settings": self.core_settings,
+            "notifier": self.notifier,
+            "outbox": self.outbox,
+            "cogs_manager": self.cogs_manager,
+            "blacklist": self.blacklist,
+            "i18n": self.i18n,
+            "chunking": self.chunking,
+            "allowance": self.allowance,
+            "users": self.users,
+            "cluster": self.cluster,
+            "metrics": self.metrics,
+            "watchdog": self.watchdog,
+        }
 
     async def prepare(self) -> None:
         """Prepare the services.
 
-        This method should probably be ran as a task rather than a coroutine.
+        Services are set up concurrently, each one waiting for its dependencies to be ready.
+
+        Raises
+        ------
+        ValueError
+            If a service depends on an unknown service, or if dependencies are circular.
         """
-        await self.cogs_manager.setup()
-        await self.blacklist.setup()
-        await self.i18n.setup()
+        services = self.all
+        self._check_dependencies(services)
+
+        self.setup_timings.clear()
+        ready = {name: asyncio.Event() for name in services}
+
+        async def setup(name: str, service: "Service") -> None:
+            for dependency in service.dependencies:
+                await ready[dependency].wait()
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(service.setup_timeout):
+                    await service.setup()
+            except TimeoutError:
+                _log.error(
+                    "Service %s took longer than %ss to set up.", name, service.setup_timeout
+                )
+                raise
+            self.setup_timings[name] = time.perf_counter() - start
+            _log.debug("Service %s took %.3fs to set up.", name, self.setup_timings[name])
+            ready[name].set()
+
+        async with asyncio.TaskGroup() as group:
+            for name, service in services.items():
+                group.create_task(setup(name, service))
+
+    @staticmethod
+    def _check_dependencies(services: dict[str, "Service"]) -> None:
+        resolved: set[str] = set()
+        remaining = dict(services)
+        while remaining:
+            batch = [
+                name
+                for name, service in remaining.items()
+                if set(service.dependencies) <= resolved
+            ]
+            if not batch:
+                unknown = {
+                    dependency
+                    for service in remaining.values()
+                    for dependency in service.dependencies
+                    if dependency not in services
+                }
+                if unknown:
+                    raise ValueError(f"Unknown service dependencies: {', '.join(unknown)}")
+                raise ValueError(f"Circular service dependencies: {', '.join(remaining)}")
+            resolved.update(batch)
+            for name in batch:
+                del remaining[name]
@@ -0,0 +1,256 @@
+import asyncio
+import collections.abc
+import dataclasses
+import logging
+import typing
+
+import discord
+from discord.utils import MISSING
+
+from vindex.core.services.proto import Service
+from vindex.core.utils.caching import TTLCache
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+MAX_QUERY_MEMBERS = 100
+"""The maximum number of members that can be requested in a single gateway query."""
+
+
+@dataclasses.dataclass
+class ResolverStats:
+    """Counters of a resolver's cache."""
+
+    hits: int = 0
+    """Lookups answered from the bot's cache or the resolver's cache."""
+    misses: int = 0
+    """Lookups that had to be resolved from Discord."""
+    coalesced: int = 0
+    """Lookups that waited for a lookup already in progress."""
+    requests: int = 0
+    """Requests sent to Discord, through the API or the gateway."""
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of lookups that were not resolved from Discord."""
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+class UserResolverService(Service):
+    """Service resolving users and members that are not in the bot's cache.
+
+    Concurrent lookups of the same user or member share a single request. Fetched users and
+    members are cached for some time, and so are the ones that were not found.
+
+    Members looked up in the same guild within a short window are requested together through
+    a single gateway query.
+    """
+
+    ttl: float
+    """The number of seconds fetched users and members are cached."""
+
+    negative_ttl: float
+    """The number of seconds users and members that were not found are remembered."""
+
+    batch_window: float
+    """The number of seconds to wait for other member lookups of the same guild."""
+
+    users: TTLCache[int, discord.User | discord.NotFound]
+    members: TTLCache[tuple[int, int], discord.Member | discord.NotFound]
+    user_stats: ResolverStats
+    member_stats: ResolverStats
+
+    _pending_users: dict[int, asyncio.Task[discord.User]]
+    _pending_members: dict[tuple[int, int], asyncio.Task[discord.Member]]
+    _member_batches: dict[int, dict[int, asyncio.Future[discord.Member]]]
+    _batch_timers: dict[int, asyncio.TimerHandle]
+    _queries: set[asyncio.Task[None]]
+
+    def __init__(
+        self,
+        bot: "Vindex",
+        *,
+        max_size: int = 2048,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        batch_window: float = 0.05,
+    ) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.batch_window = batch_window
+
+        self.users = TTLCache(max_size=max_size)
+        self.members = TTLCache(max_size=max_size)
+        self.user_stats = ResolverStats()
+        self.member_stats = ResolverStats()
+
+        self._pending_users = {}
+        self._pending_members = {}
+        self._member_batches = {}
+        self._batch_timers = {}
+        self._queries = set()
+
+    async def fetch_user(self, user_id: int, /) -> discord.User:
+        """Get a user from the bot's cache, or from the resolver's cache, or fetch it.
+
+        Raises
+        ------
+        discord.NotFound
+            If the user does not exist.
+        """
+        user = self.bot.get_user(user_id)
+        if user:
+            self.user_stats.hits += 1
+            return user
+        return await self._resolve(
+            user_id,
+            self.users,
+            self._pending_users,
+            self.user_stats,
+            lambda: self._fetch_user(user_id),
+        )
+
+    async def fetch_member(self, guild: discord.Guild, user_id: int, /) -> discord.Member:
+        """Get a member from the guild's cache, or from the resolver's cache, or fetch it.
+
+        Raises
+        ------
+        discord.NotFound
+            If the member is not in the guild.
+        """
+        member = guild.get_member(user_id)
+        if member:
+            self.member_stats.hits += 1
+            return member
+        return await self._resolve(
+            (guild.id, user_id),
+            self.members,
+            self._pending_members,
+            self.member_stats,
+            lambda: self._query_member(guild, user_id),
+        )
+
+    async def _fetch_user(self, user_id: int) -> discord.User:
+        self.user_stats.requests += 1
+        return await self.bot.fetch_user(user_id)
+
+    async def _query_member(self, guild: discord.Guild, user_id: int) -> discord.Member:
+        future: asyncio.Future[discord.Member] = asyncio.get_running_loop().create_future()
+        batch = self._member_batches.setdefault(guild.id, {})
+        batch[user_id] = future
+        if len(batch) >= MAX_QUERY_MEMBERS:
+            self._flush_members(guild)
+        elif guild.id not in self._batch_timers:
+            self._batch_timers[guild.id] = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush_members, guild
+            )
+        return await future
+
+    def _flush_members(self, guild: discord.Guild) -> None:
+        timer = self._batch_timers.pop(guild.id, None)
+        if timer:
+            timer.cancel()
+        batch = self._member_batches.pop(guild.id, None)
+        if batch:
+            task = asyncio.create_task(self._query_members(guild, batch))
+            self._queries.add(task)
+            task.add_done_callback(self._queries.discard)
+
+    async def _query_members(
+        self, guild: discord.Guild, batch: dict[int, asyncio.Future[discord.Member]]
+    ) -> None:
+        self.member_stats.requests += 1
+        try:
+            members = await guild.query_members(
+                user_ids=list(batch), limit=MAX_QUERY_MEMBERS, cache=True
+            )
+        except (asyncio.TimeoutError, discord.ClientException):
+            _log.debug(
+                "Failed to query %s members of guild %s, fetching them instead.",
+                len(batch),
+                guild.id,
+                exc_info=True,
+            )
+            members = []
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        found = {member.id: member for member in members}
+        missing = [user_id for user_id in batch if user_id not in found]
+        # Members that were not returned are fetched to get a proper NotFound.
+        self.member_stats.requests += len(missing)
+        results = await asyncio.gather(
+            *(guild.fetch_member(user_id) for user_id in missing), return_exceptions=True
+        )
+        found.update(zip(missing, results))
+
+        for user_id, future in batch.items():
+            if future.done():
+                continue
+            result = found[user_id]
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def forget_user(self, user_id: int, /) -> None:
+        """Remove a user from the resolver's cache."""
+        self.users.pop(user_id)
+
+    def forget_member(self, guild_id: int, user_id: int, /) -> None:
+        """Remove a member from the resolver's cache."""
+        self.members.pop((guild_id, user_id))
+
+    async def _resolve[
+        T
+    ](
+        self,
+        key: typing.Any,
+        cache: TTLCache[typing.Any, typing.Any],
+        pending: dict[typing.Any, asyncio.Task[typing.Any]],
+        stats: ResolverStats,
+        fetch: collections.abc.Callable[[], collections.abc.Coroutine[typing.Any, typing.Any, T]],
+    ) -> T:
+        cached = cache.get(key)
+        if cached is not MISSING:
+            stats.hits += 1
+            if isinstance(cached, discord.NotFound):
+                raise cached.with_traceback(None)
+            return cached
+
+        task = pending.get(key)
+        if task is not None:
+            stats.coalesced += 1
+        else:
+            stats.misses += 1
+            task = asyncio.create_task(fetch())
+            pending[key] = task
+
+            def done(task: asyncio.Task[T]) -> None:
+                del pending[key]
+                if task.cancelled():
+                    return
+                exception = task.exception()
+                if exception is None:
+                    cache.put(key, task.result(), self.ttl)
+                elif isinstance(exception, discord.NotFound):
+                    cache.put(key, exception, self.negative_ttl)
+
+            task.add_done_callback(done)
+
+        # Shielded so a cancelled caller does not cancel the lookup of the others.
+        return await asyncio.shield(task)
+
+    async def setup(self) -> None:
+        """Setup the user resolver service.
+
+        Caches are filled as users and members are resolved.
+        """
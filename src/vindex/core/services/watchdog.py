@@ -0,0 +1,147 @@
+import asyncio
+import collections
+import collections.abc
+import inspect
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+import types
+import typing
+
+from vindex.core.services.proto import Service
+
+if typing.TYPE_CHECKING:
+    from vindex.core.bot import Vindex
+
+
+_log = logging.getLogger(__name__)
+
+PROBE_INTERVAL = 0.1
+"""The number of seconds between two measures of the event loop's lag."""
+
+RECENT_SAMPLES = 600
+"""The number of lag measures kept to compute percentiles, a minute's worth."""
+
+STACK_LIMIT = 20
+"""The maximum number of frames logged when the event loop is blocked."""
+
+type LagHook = collections.abc.Callable[[float], None]
+"""A function called with each lag measure, in seconds."""
+
+
+def describe_frame(frame: types.FrameType) -> str:
+    """Describe what a blocked thread is running, from its innermost frame.
+
+    The innermost coroutine is preferred, as it is the one that should have awaited.
+    """
+    current: types.FrameType | None = frame
+    while current is not None:
+        if current.f_code.co_flags & (inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR):
+            break
+        current = current.f_back
+    if current is not None:
+        code = current.f_code
+        return f"coroutine {code.co_qualname} ({code.co_filename}:{current.f_lineno})"
+    # A callback without Python frames of its own, ran by asyncio's default loop.
+    handle = frame.f_locals.get("self")
+    if isinstance(handle, asyncio.Handle):
+        return f"callback {handle!r}"
+    return f"{frame.f_code.co_qualname} ({frame.f_code.co_filename}:{frame.f_lineno})"
+
+
+class WatchdogService(Service):
+    """Service watching the event loop's lag.
+
+    A task measures how late the loop runs it, continuously. A helper thread checks that the
+    task keeps running. When the loop is blocked longer than the threshold, the thread samples
+    the loop thread's stack and logs what was blocking it.
+    """
+
+    threshold: float | None
+    """Seconds the loop can be blocked before what blocks it is logged. None to disable."""
+
+    lag_hooks: list[LagHook]
+    """Functions called with each lag measure."""
+
+    _recent: collections.deque[float]
+    _heartbeat: float
+    _loop_thread: int | None
+    _reported: float
+    _probe: asyncio.Task[None] | None
+    _thread: threading.Thread | None
+    _stopped: threading.Event
+
+    def __init__(self, bot: "Vindex", *, threshold: float | None = 0.25) -> None:
+        self.bot = bot
+        self.threshold = threshold
+        self.lag_hooks = []
+        self._recent = collections.deque(maxlen=RECENT_SAMPLES)
+        self._heartbeat = time.monotonic()
+        self._loop_thread = None
+        self._reported = 0.0
+        self._probe = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def percentiles(self) -> dict[str, float]:
+        """The 50th, 90th and 99th percentiles of the recent lag measures, in seconds."""
+        samples = list(self._recent)
+        if len(samples) < 2:
+            value = samples[0] if samples else 0.0
+            return {"0.5": value, "0.9": value, "0.99": value}
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        return {"0.5": cuts[49], "0.9": cuts[89], "0.99": cuts[98]}
+
+    async def _run_probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lag = max(0.0, loop.time() - start - PROBE_INTERVAL)
+            self._recent.append(lag)
+            for hook in self.lag_hooks:
+                hook(lag)
+            if self.threshold is not None and lag > self.threshold:
+                _log.warning("The event loop was blocked for %.3fs.", lag)
+
+    def _watch(self) -> None:
+        assert self.threshold is not None
+        while not self._stopped.wait(PROBE_INTERVAL):
+            heartbeat = self._heartbeat
+            # The probe should have woken up one interval after its heartbeat.
+            blocked = time.monotonic() - heartbeat - PROBE_INTERVAL
+            if blocked <= self.threshold or heartbeat == self._reported:
+                continue
+            # Only reported once per stall.
+            self._reported = heartbeat
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                typing.cast(int, self._loop_thread)
+            )
+            if frame is None:
+                continue
+            _log.warning(
+                "The event loop is blocked for more than %.3fs, by %s. Stack:\n%s",
+                self.threshold,
+                describe_frame(frame),
+                "".join(traceback.format_stack(frame, limit=STACK_LIMIT)),
+            )
+
+    def stop(self) -> None:
+        """Stop watching the event loop."""
+        self._stopped.set()
+        if self._probe:
+            self._probe.cancel()
+
+    async def setup(self) -> None:
+        """Setup the watchdog service, starting the probe and its helper thread."""
+        self._loop_thread = threading.get_ident()
+        self._probe = asyncio.create_task(self._run_probe())
+        if self.threshold is not None:
+            self._thread = threading.Thread(
+                target=self._watch, name="vindex-watchdog", daemon=True
+            )
+            self._thread.start()
@@ -0,0 +1,130 @@
+import asyncio
+import collections.abc
+import itertools
+import typing
+
+from vindex.core.utils.futures import set_exceptions
+
+DEFAULT_BATCH_SIZE = 1000
+"""The maximum number of keys loaded by a single query."""
+
+type LoadMany[K, V] = collections.abc.Callable[
+    [list[K]], collections.abc.Awaitable[collections.abc.Mapping[K, V]]
+]
+"""A function loading many keys at once, returning the value of each key found."""
+
+
+class BatchLoader[K, V]:
+    """Merge the loads of single keys made during the same event loop iteration.
+
+    Every key requested before the loop gets to run the scheduled batch is loaded by a single
+    call to ``load_many``. A key requested many times is only loaded once, and every caller gets
+    the same result.
+    """
+
+    max_batch_size: int
+    """The maximum number of keys given to a single call to ``load_many``."""
+
+    loads: int
+    """Number of keys requested."""
+    batches: int
+    """Number of calls made to ``load_many``."""
+
+    _load_many: LoadMany[K, V]
+    _pending: dict[K, asyncio.Future[V | None]]
+    _scheduled: bool
+    _tasks: set[asyncio.Task[None]]
+
+    def __init__(
+        self, load_many: LoadMany[K, V], *, max_batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.loads = 0
+        self.batches = 0
+        self._load_many = load_many
+        self._pending = {}
+        self._scheduled = False
+        self._tasks = set()
+
+    async def load(self, key: K, /) -> V | None:
+        """Load a key, along with the other keys requested during this iteration.
+
+        Returns
+        -------
+        V or None
+            The value of the key. None if it was not found.
+
+        Raises
+        ------
+        Exception
+            Any exception raised by ``load_many`` while loading the key's batch.
+        """
+        self.loads += 1
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        # A cancelled caller must not cancel the load for the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        for keys in itertools.batched(pending, self.max_batch_size):
+            task = asyncio.create_task(self._load({key: pending[key] for key in keys}))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, futures: dict[K, asyncio.Future[V | None]]) -> None:
+        self.batches += 1
+        try:
+            values = await self._load_many(list(futures))
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            set_exceptions(futures.values(), exception)
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class ModelLoader[M](BatchLoader[int, M]):
+    """Batch loader of Prisma records by ID.
+
+    IDs are stored as strings in the database, and given as integers to the loader.
+    """
+
+    def __init__(
+        self,
+        model: type[M],
+        *,
+        include: collections.abc.Mapping[str, typing.Any] | None = None,
+        client: collections.abc.Callable[[], typing.Any] | None = None,
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """Parameters
+        ----------
+        model : type
+            The Prisma model to load, which must have a string ``id`` field.
+        include : Mapping, optional
+            The relations to include in the loaded records.
+        client : Callable, optional
+            A function returning the Prisma client to query, called for each batch, such as
+            :py:meth:`vindex.core.bot.Vindex.reader`. Defaults to the registered client.
+        max_batch_size : int
+            The maximum number of IDs sent in a single ``IN`` query.
+        """
+        self.model = model
+        self.include = include
+        self.client = client
+        super().__init__(self._find_many, max_batch_size=max_batch_size)
+
+    async def _find_many(self, ids: list[int]) -> dict[int, M]:
+        client = self.client() if self.client else None
+        actions = typing.cast(typing.Any, self.model).prisma(client)
+        records = await actions.find_many(
+            where={"id": {"in": [str(record_id) for record_id in ids]}}, include=self.include
+        )
+        return {int(record.id): record for record in records}
@@ -0,0 +1,47 @@
+import collections
+import time
+
+from discord.utils import MISSING
+
+
+class TTLCache[K, V]:
+    """A least-recently-used cache whose entries expire after some time."""
+
+    max_size: int
+    """The maximum number of entries kept."""
+
+    _entries: collections.OrderedDict[K, tuple[float, V]]
+
+    def __init__(self, *, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V:
+        """Get an entry, or ``discord.utils.MISSING`` if there is none or if it expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V, ttl: float) -> None:
+        """Add an entry, evicting the least recently used entry if the cache is full."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Remove an entry, if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
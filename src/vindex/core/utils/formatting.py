@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from babel.dates import format_datetime as _format_datetime
 from babel.dates import format_timedelta as _format_timedelta
 from babel.lists import format_list as _format_list
-from babel.numbers import format_number as _format_number
+from babel.numbers import format_decimal as _format_decimal
 from discord.utils import escape_markdown as _escape_markdown
 from discord.utils import escape_mentions as _escape_mentions
 from discord.utils import utcnow as _utcnow
@@ -308,7 +308,7 @@ class Humanize:
         str
             The humanized number.
         """
-        return _format_number(number, locale=get_babel_current_language())
+        return _format_decimal(number, locale=get_babel_current_language())
 
     @staticmethod
     def date(
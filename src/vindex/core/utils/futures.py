@@ -0,0 +1,19 @@
+import asyncio
+import collections.abc
+import typing
+
+
+def set_results[T](futures: collections.abc.Iterable[asyncio.Future[T]], result: T, /) -> None:
+    """Set the result of every future that is not done yet."""
+    for future in futures:
+        if not future.done():
+            future.set_result(result)
+
+
+def set_exceptions(
+    futures: collections.abc.Iterable[asyncio.Future[typing.Any]], exception: BaseException, /
+) -> None:
+    """Set the exception of every future that is not done yet."""
+    for future in futures:
+        if not future.done():
+            future.set_exception(exception)
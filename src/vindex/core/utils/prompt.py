@@ -67,7 +67,7 @@ class ConfirmView(discord.ui.View):
             else:
                 item.disabled = True
         if self.message:
-            await self.message.edit(view=self)
+            await self.ctx.bot.services.outbox.edit(self.message, view=self)
 
     @discord.ui.button(label="Yes", style=discord.ButtonStyle.green, custom_id="yes")
     async def yes(self, interaction: discord.Interaction, _: discord.ui.Button[typing.Self]):
@@ -0,0 +1,175 @@
+import collections
+import collections.abc
+import contextlib
+import contextvars
+import dataclasses
+import logging
+import time
+import typing
+
+from prisma import Client
+
+if typing.TYPE_CHECKING:
+    from pydantic import BaseModel
+
+    from prisma._types import PrismaMethod
+
+_log = logging.getLogger(__name__)
+
+WRITE_METHODS = frozenset(
+    {
+        "execute_raw",
+        "create",
+        "delete",
+        "update",
+        "upsert",
+        "create_many",
+        "delete_many",
+        "update_many",
+    }
+)
+"""Operations that write to the database."""
+
+type QueryHook = collections.abc.Callable[[str | None, str, float, bool], None]
+"""A function called after each query with its model name, operation, duration in seconds, and
+whether it failed."""
+
+
+@dataclasses.dataclass
+class QueryScope:
+    """What queries are ran for, such as a command or an event."""
+
+    name: str
+    """The name of the scope."""
+
+    counts: collections.Counter[tuple[str | None, str]] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+    """Number of queries ran in the scope, by model name and operation."""
+
+    wrote: bool = False
+    """Whether a query ran in the scope wrote to the database."""
+
+
+_current_scope: contextvars.ContextVar[QueryScope | None] = contextvars.ContextVar(
+    "query_scope", default=None
+)
+
+
+def get_query_scope() -> QueryScope | None:
+    """Return the scope queries are currently ran in, if any."""
+    return _current_scope.get()
+
+
+@contextlib.contextmanager
+def query_scope(name: str) -> collections.abc.Iterator[QueryScope]:
+    """Tag the queries ran in this context, including in the tasks it creates, with a scope.
+
+    Parameters
+    ----------
+    name : str
+        The name of the scope, such as ``command ping`` or ``event on_guild_join``.
+    """
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+class VindexClient(Client):
+    """The Prisma client used by Vindex.
+
+    Keeps count of the queries it runs, by model and operation, and calls its hooks after each
+    query. Queries ran in a transaction or a batch are not counted.
+
+    Queries slower than ``slow_query_threshold`` are logged with their scope. If
+    ``repeated_query_threshold`` is set, a warning is logged when a single scope runs more
+    similar queries (same model and operation) than allowed, which usually means the queries
+    should be batched.
+    """
+
+    query_counts: collections.Counter[tuple[str | None, str]]
+    """Number of queries ran, by model name (None for raw queries) and operation."""
+
+    query_hooks: list[QueryHook]
+    """Functions called after each query."""
+
+    slow_query_threshold: float | None
+    """Queries taking more seconds than this are logged. None to disable."""
+
+    repeated_query_threshold: int | None
+    """Maximum number of similar queries a scope can run before a warning. None to disable."""
+
+    last_write: float
+    """When the latest write was made, from :py:func:`time.monotonic`. 0 if none was made."""
+
+    def __init__(
+        self,
+        *,
+        slow_query_threshold: float | None = None,
+        repeated_query_threshold: int | None = None,
+        **kwargs: typing.Any,
+    ) -> None:
+        self.query_counts = collections.Counter()
+        self.query_hooks = []
+        self.slow_query_threshold = slow_query_threshold
+        self.repeated_query_threshold = repeated_query_threshold
+        self.last_write = 0.0
+        super().__init__(**kwargs)
+
+    @property
+    def query_count(self) -> int:
+        """Total number of queries ran."""
+        return self.query_counts.total()
+
+    async def _execute(
+        self,
+        method: "PrismaMethod",
+        arguments: dict[str, typing.Any],
+        model: "type[BaseModel] | None" = None,
+        root_selection: list[str] | None = None,
+    ) -> typing.Any:
+        model_name = model.__name__ if model else None
+        self.query_counts[(model_name, method)] += 1
+        scope = _current_scope.get()
+        if scope and self.repeated_query_threshold is not None:
+            self._count_in_scope(scope, model_name, method)
+        if method in WRITE_METHODS:
+            self.last_write = time.monotonic()
+            if scope:
+                scope.wrote = True
+
+        failed = True
+        start = time.perf_counter()
+        try:
+            result = await super()._execute(method, arguments, model, root_selection)
+            failed = False
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            if self.slow_query_threshold is not None and duration > self.slow_query_threshold:
+                _log.warning(
+                    "Slow query: %s.%s took %.3fs (in %s).",
+                    model_name or "raw",
+                    method,
+                    duration,
+                    scope.name if scope else "no scope",
+                )
+            for hook in self.query_hooks:
+                hook(model_name, method, duration, failed)
+
+    def _count_in_scope(self, scope: QueryScope, model_name: str | None, method: str) -> None:
+        assert self.repeated_query_threshold is not None
+        key = (model_name, method)
+        scope.counts[key] += 1
+        # Only warned once per scope and query.
+        if scope.counts[key] == self.repeated_query_threshold + 1:
+            _log.warning(
+                "%s ran more than %s %s.%s queries. These should probably be batched.",
+                scope.name,
+                self.repeated_query_threshold,
+                model_name or "raw",
+                method,
+            )
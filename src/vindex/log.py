@@ -0,0 +1,235 @@
+"""Logging pipeline keeping formatting and writing off the event loop's thread.
+
+Records are put in a bounded queue by :py:class:`OverloadQueueHandler`, and handled in batches by
+:py:class:`BatchListener`, in its own thread.
+"""
+
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+import typing
+
+DEFAULT_QUEUE_SIZE = 10_000
+"""The default maximum number of records waiting to be handled."""
+
+BATCH_SIZE = 512
+"""The maximum number of records handled at once."""
+
+DROP_REPORT_INTERVAL = 10.0
+"""The minimum number of seconds between two reports of dropped records."""
+
+_STOP = object()
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as compact JSON objects, one per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, typing.Any] = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class OverloadQueueHandler(logging.handlers.QueueHandler):
+    """Put records in a bounded queue, without ever blocking.
+
+    When the queue is more than half full, only one record in ``sample_rate`` below
+    ``WARNING`` is kept. When it is full, records are dropped.
+
+    The message of kept records is rendered before they are queued, as its arguments may change
+    once the logging thread returns. So is their traceback, to not keep its frames alive.
+    """
+
+    queue: "queue.Queue[typing.Any]"
+
+    sample_rate: int
+    """One record in this many is kept under overload."""
+
+    dropped: int
+    """Number of records dropped because the queue was full."""
+    sampled_out: int
+    """Number of records left out by sampling."""
+
+    def __init__(self, log_queue: "queue.Queue[typing.Any]", *, sample_rate: int = 10) -> None:
+        super().__init__(log_queue)
+        self.sample_rate = max(sample_rate, 1)
+        self.dropped = 0
+        self.sampled_out = 0
+        self._seen = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Sampled before preparing, so records left out cost as little as possible. An unbounded
+        # queue is never overloaded.
+        if (
+            record.levelno < logging.WARNING
+            and self.queue.maxsize > 0
+            and self.queue.qsize() * 2 >= self.queue.maxsize
+        ):
+            self._seen += 1
+            if self._seen % self.sample_rate:
+                self.sampled_out += 1
+                return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The rest of the formatting is done by the listener, in its thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler writing many records at once, with a single write and flush."""
+
+    def emit_batch(self, records: list[logging.LogRecord]) -> None:
+        """Write the records this handler accepts."""
+        lines: list[str] = []
+        for record in records:
+            if record.levelno < self.level or not self.filter(record):
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:  # pylint: disable=broad-exception-caught
+                self.handleError(record)
+        if not lines:
+            return
+        text = "".join(lines)
+        with self.lock:  # pyright: ignore[reportOptionalContextManager]
+            try:
+                if self.stream is None:  # pyright: ignore[reportUnnecessaryComparison]
+                    self.stream = self._open()
+                if self.maxBytes and self.stream.tell() + len(text) >= self.maxBytes:
+                    self.doRollover()
+                self.stream.write(text)
+                self.stream.flush()
+            except Exception:  # pylint: disable=broad-exception-caught
+                self.handleError(records[-1])
+
+
+class BatchListener:
+    """Handle the records of a queue in a thread, in batches.
+
+    Handlers with an ``emit_batch`` method get every record of a batch at once, other handlers
+    get them one by one.
+    """
+
+    queue: "queue.Queue[typing.Any]"
+    handlers: tuple[logging.Handler, ...]
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[typing.Any]",
+        *handlers: logging.Handler,
+        source: OverloadQueueHandler | None = None,
+    ) -> None:
+        """Parameters
+        ----------
+        log_queue : queue.Queue
+            The queue records are read from.
+        *handlers : logging.Handler
+            The handlers records are given to.
+        source : OverloadQueueHandler, optional
+            The handler filling the queue, whose dropped records are reported.
+        """
+        self.queue = log_queue
+        self.handlers = handlers
+        self.source = source
+        self._thread: threading.Thread | None = None
+        self._reported = (0, 0)
+        self._reported_at = 0.0
+
+    def start(self) -> None:
+        """Start handling records in a thread."""
+        self._thread = threading.Thread(target=self._run, name="vindex-logging", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Handle the records left in the queue, and stop the thread."""
+        if self._thread is None:
+            return
+        # Blocks, so the stop is never dropped.
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            self._handle([record for record in batch if record is not _STOP])
+            if stop:
+                self._report_drops(force=True)
+                return
+
+    def _handle(self, records: list[logging.LogRecord]) -> None:
+        self._report_drops()
+        for handler in self.handlers:
+            emit_batch = getattr(handler, "emit_batch", None)
+            if emit_batch is not None:
+                emit_batch(records)
+                continue
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def _report_drops(self, *, force: bool = False) -> None:
+        if self.source is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._reported_at < DROP_REPORT_INTERVAL:
+            return
+        counts = (self.source.dropped, self.source.sampled_out)
+        dropped, sampled_out = (new - old for new, old in zip(counts, self._reported))
+        if not dropped and not sampled_out:
+            return
+        self._reported, self._reported_at = counts, now
+        record = logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            "Logging is overloaded: %s records dropped and %s left out by sampling.",
+            (dropped, sampled_out),
+            None,
+        )
+        for handler in self.handlers:
+            emit_batch = getattr(handler, "emit_batch", None)
+            if emit_batch is not None:
+                emit_batch([record])
+            else:
+                handler.handle(record)
@@ -0,0 +1,201 @@
+import builtins
+import contextlib
+import cProfile
+import dataclasses
+import datetime
+import functools
+import importlib
+import logging
+import pathlib
+import pstats
+import threading
+import time
+import typing
+
+import platformdirs
+
+if typing.TYPE_CHECKING:
+    import collections.abc
+
+    from vindex.core.bot import Vindex
+    from vindex.database import VindexClient
+
+_log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Measure:
+    """Timings of a single startup phase or extension."""
+
+    name: str
+    wall_time: float = 0.0
+    """Seconds spent in the phase."""
+    import_time: float = 0.0
+    """Seconds spent importing modules during the phase."""
+    queries: int = 0
+    """Number of database queries ran during the phase."""
+
+
+class StartupProfiler:
+    """Measure the time spent in each phase of Vindex's startup.
+
+    The import time is measured by wrapping :py:func:`builtins.__import__` and
+    :py:func:`importlib.import_module`, this should only be used when profiling. The body of an
+    extension's own module is executed by discord.py without either, and only counts in the
+    extension's wall time.
+    """
+
+    phases: list[Measure]
+    extensions: list[Measure]
+    database: "VindexClient | None"
+
+    def __init__(self, *, use_cprofile: bool = False) -> None:
+        self.phases = []
+        self.extensions = []
+        self.database = None
+        self.use_cprofile = use_cprofile
+        self.started_at = datetime.datetime.now()
+
+        self._import_time = 0.0
+        self._import_depth = threading.local()
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        self._cprofile: cProfile.Profile | None = None
+        self._gateway_start = time.perf_counter()
+
+    def install(self) -> None:
+        """Start measuring the time spent importing modules."""
+        builtins.__import__ = functools.partial(self._timed_import, self._original_import)
+        importlib.import_module = functools.partial(
+            self._timed_import, self._original_import_module
+        )
+
+    def uninstall(self) -> None:
+        """Stop measuring the time spent importing modules."""
+        builtins.__import__ = self._original_import
+        importlib.import_module = self._original_import_module
+
+    def _timed_import(
+        self,
+        original: "collections.abc.Callable[..., typing.Any]",
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        depth = getattr(self._import_depth, "value", 0)
+        if depth:
+            return original(*args, **kwargs)
+
+        self._import_depth.value = 1
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            self._import_time += time.perf_counter() - start
+            self._import_depth.value = 0
+
+    @property
+    def _query_count(self) -> int:
+        return self.database.query_count if self.database else 0
+
+    @contextlib.contextmanager
+    def measure(self, name: str, into: list[Measure]) -> "collections.abc.Iterator[Measure]":
+        """Measure a block of code, and append the result to a list of measures."""
+        measure = Measure(name)
+        import_time = self._import_time
+        queries = self._query_count
+        start = time.perf_counter()
+        try:
+            yield measure
+        finally:
+            measure.wall_time = time.perf_counter() - start
+            measure.import_time = self._import_time - import_time
+            measure.queries = self._query_count - queries
+            into.append(measure)
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager[Measure]:
+        """Measure a phase of the startup."""
+        return self.measure(name, self.phases)
+
+    def attach(self, bot: "Vindex") -> None:
+        """Measure the bot's setup hook, each extension it loads, and the gateway connection."""
+        self.database = typing.cast("VindexClient", bot.database)
+
+        load_extension = bot.load_extension
+        setup_hook = bot.setup_hook
+
+        @functools.wraps(load_extension)
+        async def measured_load_extension(name: str, *, package: str | None = None) -> None:
+            with self.measure(name, self.extensions):
+                await load_extension(name, package=package)
+
+        @functools.wraps(setup_hook)
+        async def measured_setup_hook() -> None:
+            with self.phase("setup_hook"):
+                if self.use_cprofile:
+                    self._cprofile = cProfile.Profile()
+                    self._cprofile.enable()
+                try:
+                    await setup_hook()
+                finally:
+                    if self._cprofile:
+                        self._cprofile.disable()
+            self._gateway_start = time.perf_counter()
+
+        bot.load_extension = measured_load_extension
+        bot.setup_hook = measured_setup_hook
+
+    async def report_when_ready(self, bot: "Vindex") -> None:
+        """Wait for the bot to be ready, then write the report."""
+        await bot.wait_until_ready()
+        self.phases.append(
+            Measure("gateway connect", wall_time=time.perf_counter() - self._gateway_start)
+        )
+        self.uninstall()
+        path = self.write_report(bot)
+        _log.info("Startup profile written to %s", path)
+
+    def write_report(self, bot: "Vindex | None" = None) -> pathlib.Path:
+        """Write the report to the log directory.
+
+        Returns
+        -------
+        pathlib.Path
+            The path to the report. If cProfile was used, its stats are written next to it.
+        """
+        directory = platformdirs.user_log_path("vindex", ensure_exists=True)
+        stem = f"startup-{self.started_at:%Y%m%d-%H%M%S}"
+        path = directory / f"{stem}.txt"
+
+        lines = [f"Vindex startup profile - {self.started_at:%Y-%m-%d %H:%M:%S}", ""]
+        lines += self._format_table("Phase", self.phases)
+        lines += ["", *self._format_table("Extension", self.extensions)]
+        if bot:
+            lines += ["", f"{'Service':<40}{'Wall (ms)':>12}"]
+            for name, timing in bot.services.setup_timings.items():
+                lines.append(f"{name:<40}{timing * 1000:>12.1f}")
+        if self.database:
+            lines += ["", f"{'Model':<20}{'Operation':<20}{'Queries':>12}"]
+            for (model, operation), count in self.database.query_counts.most_common():
+                lines.append(f"{model or '(raw)':<20}{operation:<20}{count:>12}")
+
+        if self._cprofile:
+            stats_path = directory / f"{stem}.prof"
+            self._cprofile.dump_stats(stats_path)
+            lines += ["", f"cProfile stats of setup_hook written to {stats_path}", ""]
+            with path.with_suffix(".cprofile.txt").open("w", encoding="utf-8") as stream:
+                pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(
+                    50
+                )
+
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    @staticmethod
+    def _format_table(title: str, measures: list[Measure]) -> list[str]:
+        lines = [f"{title:<40}{'Wall (ms)':>12}{'Imports (ms)':>14}{'Queries':>10}"]
+        for measure in measures:
+            lines.append(
+                f"{measure.name:<40}{measure.wall_time * 1000:>12.1f}"
+                f"{measure.import_time * 1000:>14.1f}{measure.queries:>10}"
+            )
+        return lines
@@ -1,6 +1,7 @@
 import dataclasses
 import logging
 import os
+import typing
 
 _log = logging.getLogger(__name__)
 
@@ -11,10 +12,54 @@ class Settings:
 
     token: str
     database_url: str
+    database_replica_url: str | None = None
+    """The URL of a read replica of the database, for read-only queries. None if unused."""
+    replica_max_lag: float = 1.0
+    """Seconds after a write during which reads are not sent to the replica."""
+    max_cached_locales: int | None = None
+    """The maximum number of guild locales kept in memory. None if unbounded."""
+    metrics_host: str = "127.0.0.1"
+    """The address the metrics endpoint listens on."""
+    metrics_port: int | None = None
+    """The port of the metrics endpoint. None if disabled."""
+    slow_query_threshold: float | None = 0.5
+    """Queries taking more seconds than this are logged. None if disabled."""
+    repeated_query_threshold: int = 10
+    """Number of similar queries a command or event can run before a warning, in development."""
+    loop_lag_threshold: float | None = 0.25
+    """Seconds the event loop can be blocked before what blocks it is logged. None if disabled."""
+
+
+@typing.overload
+def _read_number[N: (int, float)](name: str, kind: type[N], default: N) -> N:
+    ...
+
+
+@typing.overload
+def _read_number[N: (int, float)](name: str, kind: type[N], default: None = None) -> N | None:
+    ...
+
+
+def _read_number[N: (int, float)](name: str, kind: type[N], default: N | None = None) -> N | None:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}.") from None
 
 
 def read_settings() -> Settings:
-    """Read settings from environment variables."""
+    """Read settings from environment variables.
+
+    Raises
+    ------
+    KeyError
+        If a required environment variable is missing.
+    ValueError
+        If an environment variable is invalid, or if the database URL cannot be made.
+    """
     db_url = os.environ.get("VINDEX_DB_URL")
 
     if not db_url:
@@ -40,7 +85,18 @@ def read_settings() -> Settings:
         # *sigh* anyone that doesn't uses Docker should not bother me... hopefullyyyyyy?
         db_url = f"postgresql://{pg_user}:{pg_password}@db:{pg_port}/{pg_db}"
 
+    slow_query_threshold = _read_number("VINDEX_SLOW_QUERY_THRESHOLD", float, 0.5)
+    loop_lag_threshold = _read_number("VINDEX_LOOP_LAG_THRESHOLD", float, 0.25)
+
     return Settings(
         token=os.environ["VINDEX_TOKEN"],
         database_url=db_url,
+        database_replica_url=os.environ.get("VINDEX_DB_REPLICA_URL") or None,
+        replica_max_lag=_read_number("VINDEX_DB_REPLICA_MAX_LAG", float, 1.0),
+        max_cached_locales=_read_number("VINDEX_MAX_CACHED_LOCALES", int),
+        metrics_host=os.environ.get("VINDEX_METRICS_HOST", "127.0.0.1"),
+        metrics_port=_read_number("VINDEX_METRICS_PORT", int),
+        slow_query_threshold=slow_query_threshold or None,
+        repeated_query_threshold=_read_number("VINDEX_REPEATED_QUERY_THRESHOLD", int, 10),
+        loop_lag_threshold=loop_lag_threshold or None,
     )